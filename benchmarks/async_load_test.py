@@ -0,0 +1,95 @@
+"""
+Latency of a cheap endpoint while the same asyncio server is handling form fills.
+
+Run with ``python -m benchmarks.async_load_test``. A minimal HTTP server on localhost serves ``/ping`` and ``/fill``;
+``/fill`` either fills in the event loop thread (blocking) or through ``AsyncFiller``. A client keeps fill requests
+in flight while sampling ``/ping`` latency.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+from pdf_form.aio import AsyncFiller
+from pdf_form.template import FormTemplate
+
+TEMPLATE = Path(__file__).parent.parent / "tests" / "test_data" / "simple-form.pdf"
+DATA = {"Given Name Text Box": "Load", "Family Name Text Box": "Test", "Driving License Check Box": "Yes"}
+
+
+async def _serve(mode, filler, template):
+    async def handle(reader, writer):
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        if b"/fill" in request_line:
+            if mode == "blocking":
+                body = template.fill(DATA)
+            else:
+                body = await filler.fill(TEMPLATE, DATA)
+        else:
+            body = b"pong"
+        writer.write(b"HTTP/1.0 200 OK\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def _request(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.0\r\n\r\n".encode())
+    await writer.drain()
+    await reader.read()
+    writer.close()
+
+
+async def _run(mode, fill_clients, seconds, workers):
+    filler = AsyncFiller("process" if mode == "process" else "thread", max_workers=workers, templates=[TEMPLATE])
+    template = FormTemplate(TEMPLATE)
+    server = await _serve(mode, filler, template)
+    port = server.sockets[0].getsockname()[1]
+    deadline = time.perf_counter() + seconds
+    fills = 0
+
+    async def fill_client():
+        nonlocal fills
+        while time.perf_counter() < deadline:
+            await _request(port, "/fill")
+            fills += 1
+
+    async def ping_client():
+        latencies = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await _request(port, "/ping")
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+        return latencies
+
+    results = await asyncio.gather(ping_client(), *(fill_client() for _ in range(fill_clients)))
+    latencies = sorted(results[0])
+    server.close()
+    await server.wait_closed()
+    filler.close()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{mode:>9}: {fills / seconds:7.1f} fills/s, /ping p50 {statistics.median(latencies) * 1000:7.2f} ms,"
+        f" p99 {p99 * 1000:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent fill clients")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", default=["blocking", "thread", "process"])
+    args = parser.parse_args()
+    for mode in args.modes:
+        asyncio.run(_run(mode, args.clients, args.seconds, args.workers))
+
+
+if __name__ == "__main__":
+    main()
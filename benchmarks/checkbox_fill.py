@@ -0,0 +1,65 @@
+"""
+Checkbox/radio filling on a questionnaire-style form with many radio groups.
+
+Run with ``python -m benchmarks.checkbox_fill``. Compares the previous per-state matching (``_pdf_encode`` with
+regular expressions, re-run for every appearance state) with the state maps used by
+``update_pdf_form_fields_from_dict`` and precomputed by ``FormTemplate``.
+"""
+import io
+import re
+import urllib.parse
+
+from pypdf.generic import NameObject
+
+from pdf_form.constants import PdfDictKeys
+from pdf_form.file_operations import load_pdf
+from pdf_form.form_filling import checkbox_states, field_iter, pdf_reader_to_writer, update_pdf_form_fields_from_dict
+from pdf_form.template import FormTemplate
+
+from benchmarks.suite import best_time
+from benchmarks.synthetic import make_form
+
+PAGES = 10
+GROUPS_PER_PAGE = 30
+OPTIONS = 10
+REPEATS = 5
+
+
+def _regex_pdf_encode(value):
+    if not value:
+        return
+    if value.startswith("/"):
+        value = value[1:]
+    value = urllib.parse.quote_plus(value)
+    value = re.sub(r"\+", "#20", value)
+    value = re.sub(r"%[a-zA-Z0-9]{2}", lambda match: f"#{match.group(0)[1:]}", value)
+    return f"/{value}"
+
+
+def _per_state_matching(writer, data):
+    for annot, field, _ in field_iter(writer, data):
+        value = data[field]
+        matches = list(filter(lambda x: _regex_pdf_encode(value) == x, checkbox_states(annot)))
+        state = matches[0] if matches else PdfDictKeys.NEGATIVE_VALUE.value
+        annot[NameObject(PdfDictKeys.CHECKBOX_VALUE_KEY.value)] = NameObject(state)
+
+
+def main():
+    pdf_bytes = make_form(PAGES, 0, radio_groups_per_page=GROUPS_PER_PAGE, radio_options=OPTIONS)
+    groups = PAGES * GROUPS_PER_PAGE
+    # values with a space take the slow (quoting) path of the encoder
+    data = {f"group_{n}": f"Option {n % OPTIONS}" for n in range(groups)}
+    writer = pdf_reader_to_writer(load_pdf(io.BytesIO(pdf_bytes)))
+    template = FormTemplate(io.BytesIO(pdf_bytes))
+    print(f"{groups} radio groups, {groups * OPTIONS} widgets")
+    fields = [(field, value) for name, value in data.items() for field in template.get_field(name)]
+    for label, func in (
+        ("per-state regex matching", lambda: _per_state_matching(writer, data)),
+        ("state maps, per document", lambda: update_pdf_form_fields_from_dict(writer, data)),
+        ("precomputed template state maps", lambda: [f.state_map.get(v) for f, v in fields]),
+    ):
+        print(f"{label:>32}: {best_time(func, repeats=REPEATS) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Output size and write time of compact output at each zlib level, against the plain ``PdfWriter.write``.
+
+Run with ``python -m benchmarks.compact_output``. Uses the bundled forms, filled with a few values and manual
+annotations, and a synthetic multi-page form.
+"""
+import io
+from pathlib import Path
+
+from pdf_form.compact import write_compact
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes
+from pdf_form.form_filling import manual_add_annotations, pdf_reader_to_writer, update_pdf_form_fields_from_dict
+
+from benchmarks.suite import best_time
+from benchmarks.synthetic import make_form
+
+TEST_DATA = Path(__file__).parent.parent / "tests" / "test_data"
+LEVELS = (0, 1, 6, 9)
+REPEATS = 3
+
+
+def _forms():
+    yield "simple-form", (TEST_DATA / "simple-form.pdf").read_bytes()
+    yield "i-9", (TEST_DATA / "i-9-paper-version.pdf").read_bytes()
+    yield "synthetic 20 pages", make_form(20, 30, image_bytes_per_page=20_000)
+
+
+def _filled(pdf_bytes):
+    writer = pdf_reader_to_writer(load_pdf(io.BytesIO(pdf_bytes)))
+    update_pdf_form_fields_from_dict(writer, {"Given Name Text Box": "Alice", "field_0": "value"})
+    manual_add_annotations(writer, {(100, 100 + 20 * i, 0): f"note {i}" for i in range(10)})
+    return writer
+
+
+def _time_and_size(write, pdf_bytes):
+    return best_time(write, lambda: (_filled(pdf_bytes),), REPEATS), write(_filled(pdf_bytes))
+
+
+def main():
+    print(f"{'form':<20} {'output':<10} {'time (ms)':>10} {'size (kB)':>10}")
+    for name, pdf_bytes in _forms():
+        plain_time, plain_size = _time_and_size(lambda writer: len(write_pdf_to_bytes(writer)), pdf_bytes)
+        print(f"{name:<20} {'plain':<10} {plain_time * 1e3:>10.1f} {plain_size / 1e3:>10.1f}")
+        for level in LEVELS:
+            compact_time, compact_size = _time_and_size(
+                lambda writer: write_compact(writer, io.BytesIO(), compression_level=level), pdf_bytes
+            )
+            print(f"{name:<20} {f'level {level}':<10} {compact_time * 1e3:>10.1f} {compact_size / 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
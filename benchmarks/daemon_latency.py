@@ -0,0 +1,84 @@
+"""
+Latency of fills served by the fill daemon, against spawning a Python process per fill.
+
+Run with ``python -m benchmarks.daemon_latency``. The daemon runs in this process with worker processes on a Unix
+domain socket; each client thread fills over its own kept-alive connection.
+"""
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pdf_form.daemon import FillService, make_server
+from pdf_form.daemon_client import FillClient
+
+TEST_DATA = Path(__file__).parent.parent / "tests" / "test_data"
+TEMPLATES = {"simple-form": TEST_DATA / "simple-form.pdf", "i-9": TEST_DATA / "i-9-paper-version.pdf"}
+DATA = {"simple-form": {"Given Name Text Box": "Alice"}, "i-9": {"First_Name_Given_Name[0]": "Alice"}}
+REQUESTS = 200
+CLIENTS = (1, 4)
+SPAWNS = 5
+
+SPAWN_CODE = (
+    "import sys, json; from pdf_form.template import FormTemplate; "
+    "sys.stdout.buffer.write(FormTemplate(sys.argv[1]).fill(json.loads(sys.argv[2])))"
+)
+
+
+def _percentiles(timings):
+    timings = sorted(timings)
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def _spawn_fill(template, data):
+    command = [sys.executable, "-c", SPAWN_CODE, str(TEMPLATES[template]), json.dumps(data)]
+    subprocess.run(command, check=True, capture_output=True)
+
+
+def _client_timings(address, template, count):
+    timings = []
+    with FillClient(address) as client:
+        for _ in range(count):
+            start = time.perf_counter()
+            client.fill(template, DATA[template])
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    print(f"{'form':<12} {'mode':<22} {'p50 (ms)':>9} {'p99 (ms)':>9} {'fills/s':>8}")
+    with tempfile.TemporaryDirectory() as directory, FillService(TEMPLATES, max_workers=max(CLIENTS)) as service:
+        server = make_server(service, socket_path=Path(directory) / "fill.sock")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            for template in TEMPLATES:
+                timings = []
+                for _ in range(SPAWNS):
+                    start = time.perf_counter()
+                    _spawn_fill(template, DATA[template])
+                    timings.append(time.perf_counter() - start)
+                p50, p99 = _percentiles(timings)
+                print(f"{template:<12} {'process per fill':<22} {p50 * 1e3:>9.1f} {p99 * 1e3:>9.1f} {1 / p50:>8.1f}")
+                for clients in CLIENTS:
+                    start = time.perf_counter()
+                    with ThreadPoolExecutor(clients) as pool:
+                        results = list(pool.map(
+                            lambda _: _client_timings(server.address, template, REQUESTS // clients), range(clients)
+                        ))
+                    elapsed = time.perf_counter() - start
+                    timings = [t for result in results for t in result]
+                    p50, p99 = _percentiles(timings)
+                    mode = f"daemon, {clients} client(s)"
+                    print(f"{template:<12} {mode:<22} {p50 * 1e3:>9.1f} {p99 * 1e3:>9.1f} {len(timings) / elapsed:>8.1f}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
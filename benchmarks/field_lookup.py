@@ -0,0 +1,42 @@
+"""
+Fill time of ``update_pdf_form_fields_from_dict`` as the data dict grows.
+
+Run with ``python -m benchmarks.field_lookup``. The matched fields stay the same for every run, only the number of
+unrelated keys in the data dict grows, so fill time should stay flat.
+"""
+import io
+
+from pdf_form.file_operations import load_pdf
+from pdf_form.form_filling import annotation_iter, pdf_reader_to_writer, update_pdf_form_fields_from_dict
+
+from benchmarks.suite import best_time
+from benchmarks.synthetic import make_form
+
+PAGES = 20
+FIELDS_PER_PAGE = 40
+DATA_SIZES = (100, 1_000, 10_000)
+REPEATS = 5
+
+
+def _nested_loop_field_iter(writer, fields):
+    """The original O(annotations x fields) matching, kept for comparison"""
+    for annot, key, page_number in annotation_iter(writer):
+        for field in fields.keys():
+            if key == field:
+                yield annot, field, page_number
+
+
+def main():
+    writer = pdf_reader_to_writer(load_pdf(io.BytesIO(make_form(PAGES, FIELDS_PER_PAGE, checkbox_every=0))))
+    filled = {f"field_{n}": "value" for n in range(0, PAGES * FIELDS_PER_PAGE, 10)}
+    print(f"{PAGES * FIELDS_PER_PAGE} widgets, {len(filled)} filled fields")
+    print(f"{'data keys':>10} {'indexed (ms)':>14} {'nested loop match only (ms)':>30}")
+    for size in DATA_SIZES:
+        data = dict(filled, **{f"unrelated_{n}": "value" for n in range(size - len(filled))})
+        indexed = best_time(lambda: update_pdf_form_fields_from_dict(writer, data), repeats=REPEATS)
+        nested = best_time(lambda: list(_nested_loop_field_iter(writer, data)), repeats=REPEATS)
+        print(f"{len(data):>10} {indexed * 1000:>14.2f} {nested * 1000:>30.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Time and output size of flattening a filled form.
+
+Run with ``python -m benchmarks.flatten``. Compares ``flatten_form`` with the previous way of producing non-editable
+output, ``create_manual_dict`` followed by ``manual_add_annotations`` (which only covers text fields).
+"""
+import contextlib
+import io
+
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes
+from pdf_form.flatten import flatten_form
+from pdf_form.form_filling import (
+    create_manual_dict,
+    manual_add_annotations,
+    pdf_reader_to_writer,
+    update_pdf_form_fields_from_dict,
+)
+
+from benchmarks.suite import best_time
+from benchmarks.synthetic import make_form
+
+PAGES = 100
+FIELDS_PER_PAGE = 30
+REPEATS = 3
+
+
+def _flatten(writer, data):
+    update_pdf_form_fields_from_dict(writer, data)
+    return flatten_form(writer)
+
+
+def _manual(writer, data):
+    # create_manual_dict prints every field it moves
+    with contextlib.redirect_stdout(io.StringIO()):
+        return manual_add_annotations(writer, create_manual_dict(writer, data))
+
+
+def main():
+    pdf_bytes = make_form(PAGES, FIELDS_PER_PAGE)
+    data = {f"field_{n}": f"value {n}" if n % 4 != 3 else "Yes" for n in range(PAGES * FIELDS_PER_PAGE)}
+    print(f"{PAGES} pages, {len(data)} filled widgets")
+    print(f"{'method':>24} {'time (ms)':>10} {'output (kB)':>12}")
+
+    def setup():
+        return pdf_reader_to_writer(load_pdf(io.BytesIO(pdf_bytes))), data
+
+    for label, func in (("flatten_form", _flatten), ("manual annotations", _manual)):
+        best = best_time(func, setup, REPEATS)
+        writer, _ = setup()
+        func(writer, data)
+        size = len(write_pdf_to_bytes(writer))
+        print(f"{label:>24} {best * 1000:>10.1f} {size / 1e3:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
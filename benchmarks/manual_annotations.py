@@ -0,0 +1,68 @@
+"""
+Overlay text on every page of a 50-page document with ``manual_add_annotations``.
+
+Run with ``python -m benchmarks.manual_annotations``. The previous implementation (one canvas and one PdfReader
+parse per page, a data dict scan per page, and a rebuilt PdfWriter) is kept here for comparison.
+"""
+import io
+
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import letter  # type: ignore
+from reportlab.pdfgen import canvas  # type: ignore
+
+from pdf_form.file_operations import load_pdf
+from pdf_form.form_filling import DEFAULT_SETTINGS, manual_add_annotations, pdf_reader_to_writer
+
+from benchmarks.suite import best_time
+from benchmarks.synthetic import make_form
+
+PAGES = 50
+ANNOTATIONS_PER_PAGE = 20
+REPEATS = 3
+
+
+def _per_page_canvas(original_writer, data_dict, page_size=letter):
+    pages = {x[2] for x in data_dict.keys()}
+    page_map = {}
+    for p in pages:
+        packet = io.BytesIO()
+        new_page = canvas.Canvas(packet, pagesize=page_size)
+        for (x, y, page_number), annotation_text in data_dict.items():
+            if page_number != p or annotation_text is None:
+                continue
+            new_page.setFont(DEFAULT_SETTINGS.font_name, DEFAULT_SETTINGS.font_size)
+            new_page.setFillColorRGB(*DEFAULT_SETTINGS.font_rgb)
+            for i, line in enumerate(reversed(annotation_text.split("\n"))):
+                y = y + DEFAULT_SETTINGS.font_size * i
+                new_page.drawString(x, y, line)
+        new_page.save()
+        packet.seek(0)
+        new_page_pdf_reader = PdfReader(packet)
+        page = original_writer.pages[p]
+        try:
+            page.merge_page(new_page_pdf_reader.pages[p])
+        except IndexError:
+            pass
+        page_map[p] = page
+    output = PdfWriter()
+    for i, looped_page in enumerate(original_writer.pages):
+        output.add_page(page_map.get(i) or looped_page)
+    output.set_need_appearances_writer()
+    return output
+
+
+def main():
+    pdf_bytes = make_form(PAGES, 10)
+    data = {
+        (50 + 25 * n, 700 - 30 * n, page): f"Page {page} line {n}"
+        for page in range(PAGES)
+        for n in range(ANNOTATIONS_PER_PAGE)
+    }
+    print(f"{PAGES} pages, {len(data)} annotations")
+    for label, func in (("per-page canvas (previous)", _per_page_canvas), ("single canvas", manual_add_annotations)):
+        best = best_time(func, lambda: (pdf_reader_to_writer(load_pdf(io.BytesIO(pdf_bytes))), data), REPEATS)
+        print(f"{label:>28}: {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
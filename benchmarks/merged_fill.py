@@ -0,0 +1,63 @@
+"""
+Build time and output size of one combined document holding many filled copies of a form.
+
+Run with ``python -m benchmarks.merged_fill``. Compares ``fill_merged`` with filling a separate PdfWriter per record
+and appending each of them to one output document (only for the smaller record counts, as it grows much faster).
+"""
+import io
+import time
+
+from pypdf import PdfWriter
+
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes
+from pdf_form.form_filling import pdf_reader_to_writer, update_pdf_form_fields_from_dict
+from pdf_form.merge import fill_merged
+
+from benchmarks.synthetic import make_form
+
+PAGES = 2
+FIELDS_PER_PAGE = 20
+RECORD_COUNTS = (1, 100, 1_000, 10_000)
+# separate writers per record get too slow beyond this
+MAX_CONCATENATED = 1_000
+
+
+def _records(count):
+    return [
+        {f"field_{n}": f"record {i} value {n}" for n in range(0, PAGES * FIELDS_PER_PAGE, 2)}
+        for i in range(count)
+    ]
+
+
+def _concatenated(pdf_bytes, records):
+    output = PdfWriter()
+    for data in records:
+        writer = pdf_reader_to_writer(load_pdf(io.BytesIO(pdf_bytes)))
+        update_pdf_form_fields_from_dict(writer, data)
+        output.append(writer)
+    return output
+
+
+def _measure(build, pdf_bytes, records):
+    start = time.perf_counter()
+    writer = build(pdf_bytes, records)
+    size = len(write_pdf_to_bytes(writer))
+    return time.perf_counter() - start, size
+
+
+def main():
+    pdf_bytes = make_form(PAGES, FIELDS_PER_PAGE, image_bytes_per_page=20_000)
+    print(f"{PAGES} pages, {PAGES * FIELDS_PER_PAGE} widgets, {len(pdf_bytes) / 1e3:.0f} kB per form")
+    print(f"{'records':>8} {'merged (s)':>11} {'merged (kB)':>12} {'concatenated (s)':>17} {'concatenated (kB)':>18}")
+    for count in RECORD_COUNTS:
+        records = _records(count)
+        merged_time, merged_size = _measure(lambda pdf, data: fill_merged(io.BytesIO(pdf), data), pdf_bytes, records)
+        line = f"{count:>8} {merged_time:>11.2f} {merged_size / 1e3:>12.0f}"
+        if count <= MAX_CONCATENATED:
+            concatenated_time, concatenated_size = _measure(_concatenated, pdf_bytes, records)
+            line += f" {concatenated_time:>17.2f} {concatenated_size / 1e3:>18.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
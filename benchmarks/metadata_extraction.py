@@ -0,0 +1,48 @@
+"""
+Time and peak memory of form metadata extraction on a large, image-heavy PDF.
+
+Run with ``python -m benchmarks.metadata_extraction``. Compares walking annotations over a PdfWriter clone of the
+document (the previous behaviour of ``extract_field_names``/``extract_checkbox_values``) with walking the PdfReader
+directly.
+"""
+import io
+import time
+import tracemalloc
+
+from pdf_form.file_operations import load_pdf
+from pdf_form.form_filling import annotation_iter, extract_checkbox_values, extract_field_names, pdf_reader_to_writer
+
+from benchmarks.synthetic import make_form
+
+PAGES = 40
+IMAGE_BYTES_PER_PAGE = 1_000_000
+
+
+def _measure(func, pdf_bytes):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(load_pdf(io.BytesIO(pdf_bytes)))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def _via_writer(reader):
+    return [key for _, key, _ in annotation_iter(pdf_reader_to_writer(reader))]
+
+
+def main():
+    pdf_bytes = make_form(PAGES, 20, image_bytes_per_page=IMAGE_BYTES_PER_PAGE)
+    print(f"{PAGES} pages, {len(pdf_bytes) / 1e6:.1f} MB")
+    for label, func in (
+        ("clone to PdfWriter", _via_writer),
+        ("extract_field_names", extract_field_names),
+        ("extract_checkbox_values", extract_checkbox_values),
+    ):
+        elapsed, peak = _measure(func, pdf_bytes)
+        print(f"{label:>24}: {elapsed * 1000:8.1f} ms, peak {peak / 1e6:7.1f} MB (excluding the input bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Per-worker memory and load latency of ``load_pdf`` with and without ``use_mmap``.
+
+Run with ``python -m benchmarks.mmap_loading`` (Linux: memory is read from ``/proc``). Each worker process loads
+the same large template, fills it in place and writes it out incrementally to a discarding stream. Rss anon is
+memory private to the worker; Pss splits shared pages (such as the page cache behind a mapping) between the
+processes using them.
+"""
+import multiprocessing
+import os
+import tempfile
+import time
+
+from pdf_form.file_operations import load_pdf, write_pdf_incremental
+from pdf_form.form_filling import set_need_appearances, update_pdf_form_fields_from_dict
+
+from benchmarks.synthetic import make_form
+
+PAGES = 30
+IMAGE_BYTES_PER_PAGE = 1_000_000
+WORKERS = 8
+
+
+class _Discard:
+    def write(self, data):
+        return len(data)
+
+
+def _memory_kb() -> dict[str, int]:
+    memory = {}
+    for path, keys in (("/proc/self/status", ("RssAnon", "RssFile")), ("/proc/self/smaps_rollup", ("Pss",))):
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key in keys:
+                        memory[key] = int(value.split()[0])
+        except OSError:
+            pass
+    return memory
+
+
+def _worker(path, use_mmap, barrier, results):
+    baseline = _memory_kb()
+    start = time.perf_counter()
+    reader = load_pdf(path, use_mmap=use_mmap)
+    load_seconds = time.perf_counter() - start
+    updated = update_pdf_form_fields_from_dict(reader, {"field_0": "value", "field_3": "Yes"})
+    updated.append(set_need_appearances(reader))
+    write_pdf_incremental(reader, updated, _Discard())
+    # measure while every worker still holds its template, so shared pages are split between all of them
+    barrier.wait()
+    memory = _memory_kb()
+    barrier.wait()
+    results.put((load_seconds, {key: memory[key] - baseline.get(key, 0) for key in memory}))
+
+
+def _run(path, use_mmap):
+    context = multiprocessing.get_context("fork")
+    barrier, results = context.Barrier(WORKERS), context.Queue()
+    workers = [context.Process(target=_worker, args=(path, use_mmap, barrier, results)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    measurements = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return measurements
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "template.pdf")
+        with open(path, "wb") as f:
+            f.write(make_form(PAGES, 20, image_bytes_per_page=IMAGE_BYTES_PER_PAGE))
+        print(f"{os.path.getsize(path) / 1e6:.1f} MB template, {WORKERS} workers, growth per worker:")
+        print(f"{'mode':>10} {'load (ms)':>10} {'Rss anon (MB)':>14} {'Rss file (MB)':>14} {'Pss (MB)':>10}")
+        for label, use_mmap in (("load_pdf", False), ("use_mmap", True)):
+            measurements = _run(path, use_mmap)
+            load_ms = sum(load for load, _ in measurements) / len(measurements) * 1000
+            memory = {
+                key: sum(m[key] for _, m in measurements) / len(measurements) / 1024
+                for key in measurements[0][1]
+            }
+            print(
+                f"{label:>10} {load_ms:>10.1f} {memory.get('RssAnon', 0):>14.1f}"
+                f" {memory.get('RssFile', 0):>14.1f} {memory.get('Pss', 0):>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Throughput of the reportlab and native overlay engines of ``manual_add_annotations``.
+
+Run with ``python -m benchmarks.overlay_engines``.
+"""
+import io
+
+from pypdf import PdfReader
+
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes
+from pdf_form.form_filling import manual_add_annotations, pdf_reader_to_writer
+
+from benchmarks.suite import best_time
+from benchmarks.synthetic import make_form
+
+PAGES = 50
+ANNOTATIONS_PER_PAGE = (1, 20, 100)
+REPEATS = 3
+
+
+def main():
+    pdf_bytes = make_form(PAGES, 10)
+    print(f"{PAGES} pages")
+    print(f"{'annotations':>12} {'reportlab (ms)':>15} {'native (ms)':>12} {'native annotations/s':>21}")
+    for per_page in ANNOTATIONS_PER_PAGE:
+        data = {
+            (50 + 5 * n, 700 - 6 * n, page): f"Page {page} line {n}"
+            for page in range(PAGES)
+            for n in range(per_page)
+        }
+        timings = {
+            engine: best_time(
+                lambda writer: manual_add_annotations(writer, data, engine=engine),
+                lambda: (pdf_reader_to_writer(load_pdf(io.BytesIO(pdf_bytes))),),
+                REPEATS,
+            )
+            for engine in ("reportlab", "native")
+        }
+        print(
+            f"{len(data):>12} {timings['reportlab'] * 1000:>15.1f} {timings['native'] * 1000:>12.1f}"
+            f" {len(data) / timings['native']:>21.0f}"
+        )
+
+    writer = manual_add_annotations(
+        pdf_reader_to_writer(load_pdf(io.BytesIO(pdf_bytes))), {(50, 50, 0): "check"}, engine="native"
+    )
+    assert "check" in PdfReader(io.BytesIO(write_pdf_to_bytes(writer))).pages[0].extract_text()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Overhead of resumable jobs over ``fill_batch``, and how long a rerun takes to skip completed records.
+
+Run with ``python -m benchmarks.resumable_jobs``. The skip benchmark writes a manifest of ``SKIPPED_RECORDS`` completed
+records directly (no fills) and times a rerun over all of them.
+"""
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from pdf_form.batch import fill_batch
+from pdf_form.jobs import MANIFEST_NAME, run_job
+
+TEMPLATE = Path(__file__).parent.parent / "tests" / "test_data" / "simple-form.pdf"
+FILLED_RECORDS = 1_000
+SKIPPED_RECORDS = 200_000
+WORKERS = 2
+
+
+def _records(count):
+    return ((f"record-{n}", {"Given Name Text Box": f"Name {n}"}) for n in range(count))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        for _ in fill_batch(TEMPLATE, _records(FILLED_RECORDS), WORKERS, Path(directory) / "batch"):
+            pass
+        batch_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_job(TEMPLATE, _records(FILLED_RECORDS), Path(directory) / "job", workers=WORKERS)
+        job_time = time.perf_counter() - start
+        print(f"{FILLED_RECORDS} records, {WORKERS} workers: fill_batch {batch_time:.2f}s, run_job {job_time:.2f}s "
+              f"({(job_time / batch_time - 1):+.1%})")
+
+        skip_dir = Path(directory) / "skip"
+        skip_dir.mkdir()
+        with open(skip_dir / MANIFEST_NAME, "w") as manifest:
+            for record_id, _ in _records(SKIPPED_RECORDS):
+                entry = {"id": record_id, "path": f"{record_id}.pdf", "sha256": "0" * 64, "bytes": 0}
+                manifest.write(json.dumps(entry) + "\n")
+        start = time.perf_counter()
+        summary = run_job(TEMPLATE, _records(SKIPPED_RECORDS), skip_dir, workers=WORKERS)
+        skip_time = time.perf_counter() - start
+        print(f"rerun over {summary.skipped} completed records: {skip_time:.2f}s "
+              f"({skip_time / SKIPPED_RECORDS * 1e6:.1f} us per record, including pool startup)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Coordinate lookups with ``WidgetIndex`` against scanning every widget rect.
+
+Run with ``python -m benchmarks.spatial_lookup``.
+"""
+import random
+import time
+
+from pdf_form.schema import extract_form_schema
+from pdf_form.spatial import WidgetIndex
+
+from benchmarks.suite import best_time
+from benchmarks.synthetic import PAGE_HEIGHT, PAGE_WIDTH, make_form
+
+PAGES = 200
+FIELDS_PER_PAGE = 40
+POINTS = 10_000
+REPEATS = 3
+
+
+def _scan_containing(fields, x, y, page_number):
+    return [
+        field for field in fields
+        if field.page_number == page_number and field.rect
+        and field.rect[0] <= x <= field.rect[2] and field.rect[1] <= y <= field.rect[3]
+    ]
+
+
+def _scan_nearest(fields, x, y, page_number):
+    return min(
+        (field for field in fields if field.page_number == page_number and field.rect),
+        key=lambda f: max(f.rect[0] - x, 0, x - f.rect[2]) ** 2 + max(f.rect[1] - y, 0, y - f.rect[3]) ** 2,
+    )
+
+
+def main():
+    schema = extract_form_schema(make_form(PAGES, FIELDS_PER_PAGE))
+    start = time.perf_counter()
+    index = WidgetIndex(schema)
+    build = time.perf_counter() - start
+    rng = random.Random(0)
+    points = [(rng.uniform(0, PAGE_WIDTH), rng.uniform(0, PAGE_HEIGHT), rng.randrange(PAGES)) for _ in range(POINTS)]
+    print(f"{len(index)} widgets, index built in {build * 1000:.1f} ms, {POINTS} points")
+    print(f"{'query':>12} {'index (us/point)':>17} {'scan (us/point)':>16}")
+    for label, indexed, scanned in (
+        ("containing", index.containing, lambda x, y, p: _scan_containing(schema.fields, x, y, p)),
+        ("nearest", index.nearest, lambda x, y, p: _scan_nearest(schema.fields, x, y, p)),
+    ):
+        print(
+            f"{label:>12} {best_time(lambda: [indexed(*p) for p in points], repeats=REPEATS) / POINTS * 1e6:>17.1f}"
+            f" {best_time(lambda: [scanned(*p) for p in points[:500]], repeats=REPEATS) / 500 * 1e6:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Cold start time of the package, measured with ``python -X importtime`` in fresh interpreters.
+
+Run with ``python -m benchmarks.startup`` for a breakdown of the slowest imports of each entry point module; fails
+if one of them imports a dependency that should only load on first use (``LAZY_DEPENDENCIES``). The suite
+(``python manage.py bench``) records the same import times as ``startup/<module>``, so they are checked against the
+baseline like the other benchmarks.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import NamedTuple
+
+# modules whose import time is benchmarked: the form filling paths
+STARTUP_MODULES = ("pdf_form.form_filling", "pdf_form.template")
+# top level packages the modules above must not import
+LAZY_DEPENDENCIES = ("reportlab",)
+DEFAULT_REPEATS = 7
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """The entries of ``-X importtime`` output (stderr), in import order"""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():  # the header line
+            continue
+        entries.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def import_times(module: str) -> list[ImportTime]:
+    """Import ``module`` in a fresh interpreter and return its ``-X importtime`` entries"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def time_import(module: str, repeats: int = DEFAULT_REPEATS) -> dict:
+    """Cumulative import time of ``module`` over ``repeats`` fresh interpreters, in the suite's timing format"""
+    timings = []
+    for _ in range(repeats):
+        entries = import_times(module)
+        timings.append(next(e.cumulative_us for e in reversed(entries) if e.module == module) / 1e6)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "repeats": len(timings),
+    }
+
+
+def lazy_dependencies_imported(entries: list[ImportTime]) -> set[str]:
+    return {e.module.split(".")[0] for e in entries} & set(LAZY_DEPENDENCIES)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=STARTUP_MODULES, help="modules to import")
+    parser.add_argument("--repeats", "-r", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports listed per module")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        timing = time_import(module, args.repeats)
+        entries = import_times(module)
+        print(f"{module}: {timing['median'] * 1000:.1f} ms median, {timing['min'] * 1000:.1f} ms min")
+        print(f"  {'module':<50} {'self (ms)':>10} {'cumulative (ms)':>16}")
+        for entry in sorted(entries, key=lambda e: e.self_us, reverse=True)[:args.top]:
+            print(f"  {entry.module:<50} {entry.self_us / 1000:>10.1f} {entry.cumulative_us / 1000:>16.1f}")
+        lazy = lazy_dependencies_imported(entries)
+        if lazy:
+            failed = True
+            print(f"  FAIL imports {', '.join(sorted(lazy))}, which should only load on first use")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Benchmark suite for the form filling pipeline, with JSON results and regression checks against a baseline.
+
+Run with ``python manage.py bench`` (or ``python -m benchmarks.suite``). Every stage of the pipeline is timed on the
+bundled ``simple-form.pdf`` and ``i-9-paper-version.pdf`` and on a synthetic form with thousands of widgets across
+hundreds of pages, and the import time of the package's entry points is measured in fresh interpreters (see
+``benchmarks.startup``). ``--output`` saves the results; ``--baseline`` compares against a previous run and fails if
+any benchmark's median time grew by more than ``--threshold``.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pypdf
+
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes
+from pdf_form.form_filling import (
+    extract_checkbox_values,
+    extract_field_names,
+    manual_add_annotations,
+    pdf_reader_to_writer,
+    update_pdf_form_fields_from_dict,
+)
+
+from benchmarks.startup import STARTUP_MODULES, time_import
+from benchmarks.synthetic import make_form
+
+TEST_DATA_PATH = Path(__file__).resolve().parent.parent / "tests" / "test_data"
+BUNDLED_FORMS = {
+    "simple-form": TEST_DATA_PATH / "simple-form.pdf",
+    "i-9": TEST_DATA_PATH / "i-9-paper-version.pdf",
+}
+# (pages, widgets per page) of the synthetic form
+LARGE_FORM = (200, 25)
+QUICK_LARGE_FORM = (50, 20)
+DEFAULT_THRESHOLD = 0.1
+MANUAL_ANNOTATIONS_PER_PAGE = 10
+
+
+@dataclass
+class Benchmark:
+    """A timed function; ``setup`` is called before every run, untimed, and returns the arguments of ``run``."""
+    name: str
+    run: Callable[..., Any]
+    setup: Callable[[], tuple] = tuple
+
+
+def _time_benchmark(benchmark: Benchmark, min_repeats: int, min_seconds: float, max_repeats: int = 1000) -> dict:
+    """
+    Run a benchmark at least ``min_repeats`` times, then until ``min_seconds`` have been spent in it (or
+    ``5 * min_seconds`` in it and its setup together)
+    """
+    timings: list[float] = []
+    started = time.perf_counter()
+    while len(timings) < min_repeats or (
+        len(timings) < max_repeats
+        and sum(timings) < min_seconds
+        and time.perf_counter() - started < 5 * min_seconds
+    ):
+        args = benchmark.setup()
+        start = time.perf_counter()
+        benchmark.run(*args)
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "repeats": len(timings),
+    }
+
+
+def best_time(run: Callable[..., Any], setup: Callable[[], tuple] = tuple, repeats: int = 3) -> float:
+    """The fastest of ``repeats`` runs of ``run(*setup())`` in seconds, ``setup`` untimed (for standalone benchmarks)"""
+    return _time_benchmark(Benchmark("", run, setup), repeats, 0, repeats)["min"]
+
+
+def _fill_data(reader) -> dict:
+    """A value for every field: the first "on" state of checkboxes and a short text otherwise"""
+    data = {key: "value" for key in extract_field_names(reader) if key is not None}
+    for key, states in extract_checkbox_values(reader).items():
+        on_states = [state for state in states if state != "/Off"]
+        if on_states:
+            data[key] = on_states[0]
+    return data
+
+
+def _manual_data(page_count: int) -> dict:
+    return {
+        (72.0, 72.0 + 60 * i, page_number): f"annotation {i}\non page {page_number}"
+        for page_number in range(page_count)
+        for i in range(MANUAL_ANNOTATIONS_PER_PAGE)
+    }
+
+
+STAGES = (
+    "load_pdf",
+    "extract_field_names",
+    "extract_checkbox_values",
+    "pdf_reader_to_writer",
+    "update_pdf_form_fields_from_dict",
+    "manual_add_annotations",
+    "write_pdf_to_bytes",
+)
+
+
+def form_benchmarks(form_name: str, pdf_bytes: bytes) -> list[Benchmark]:
+    """The pipeline stages (see ``STAGES``) as benchmarks over one form"""
+    def load():
+        return load_pdf(io.BytesIO(pdf_bytes))
+
+    reader = load()
+    data = _fill_data(reader)
+    manual_data = _manual_data(len(reader.pages))
+    filled_writer = pdf_reader_to_writer(reader)
+    update_pdf_form_fields_from_dict(filled_writer, data)
+
+    return [
+        Benchmark(f"{form_name}/load_pdf", load),
+        Benchmark(f"{form_name}/extract_field_names", extract_field_names, lambda: (load(),)),
+        Benchmark(f"{form_name}/extract_checkbox_values", extract_checkbox_values, lambda: (load(),)),
+        Benchmark(f"{form_name}/pdf_reader_to_writer", pdf_reader_to_writer, lambda: (load(),)),
+        # filling the same values again does the same work, so the filled writer is reused rather than re-cloned
+        Benchmark(
+            f"{form_name}/update_pdf_form_fields_from_dict",
+            update_pdf_form_fields_from_dict,
+            lambda: (filled_writer, data),
+        ),
+        Benchmark(
+            f"{form_name}/manual_add_annotations",
+            manual_add_annotations,
+            lambda: (pdf_reader_to_writer(load()), manual_data),
+        ),
+        Benchmark(f"{form_name}/write_pdf_to_bytes", write_pdf_to_bytes, lambda: (filled_writer,)),
+    ]
+
+
+def forms(quick: bool = False) -> dict[str, Callable[[], bytes]]:
+    """The benchmarked forms by name, as functions returning their bytes"""
+    pages, fields_per_page = QUICK_LARGE_FORM if quick else LARGE_FORM
+    return {
+        **{form_name: path.read_bytes for form_name, path in BUNDLED_FORMS.items()},
+        f"synthetic-{pages}x{fields_per_page}": lambda: make_form(pages, fields_per_page, radio_groups_per_page=1),
+    }
+
+
+def run_suite(quick: bool = False, pattern: Optional[str] = None, report: Callable[[str], None] = print) -> dict:
+    """
+    Run the suite and return its results (as saved to JSON).
+    :param quick: fewer repeats and a smaller synthetic form
+    :param pattern: only run the benchmarks whose name contains this
+    :param report: called with a line of text as each benchmark finishes
+    """
+    min_repeats, min_seconds = (3, 0.2) if quick else (5, 1.0)
+    results = {}
+    for form_name, pdf_bytes in forms(quick).items():
+        # only generate and load the forms that have benchmarks to run
+        if pattern and not any(pattern in f"{form_name}/{stage}" for stage in STAGES):
+            continue
+        for benchmark in form_benchmarks(form_name, pdf_bytes()):
+            if pattern and pattern not in benchmark.name:
+                continue
+            results[benchmark.name] = timing = _time_benchmark(benchmark, min_repeats, min_seconds)
+            report(f"{benchmark.name:<60} {timing['median'] * 1000:>10.2f} ms  (x{timing['repeats']})")
+    for module in STARTUP_MODULES:
+        name = f"startup/{module}"
+        if pattern and pattern not in name:
+            continue
+        results[name] = timing = time_import(module, min_repeats)
+        report(f"{name:<60} {timing['median'] * 1000:>10.2f} ms  (x{timing['repeats']})")
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pypdf": pypdf.__version__,
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[tuple[str, float, float]]:
+    """
+    Benchmarks whose median time grew by more than ``threshold`` (a fraction, e.g. 0.1 for 10%) since ``baseline``,
+    as ``(name, baseline_median, current_median)``. Benchmarks missing from either run are ignored.
+    """
+    regressions = []
+    for name, timing in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is not None and timing["median"] > previous["median"] * (1 + threshold):
+            regressions.append((name, previous["median"], timing["median"]))
+    return regressions
+
+
+def bench(output=None, baseline=None, threshold=DEFAULT_THRESHOLD, quick=False, pattern=None) -> int:
+    """Run the suite, optionally save and compare the results; returns 1 if there are regressions, 0 otherwise"""
+    results = run_suite(quick, pattern)
+    if output is not None:
+        Path(output).write_text(json.dumps(results, indent=2))
+    if baseline is None:
+        return 0
+    regressions = compare(json.loads(Path(baseline).read_text()), results, threshold)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms (+{(after / before - 1):.0%})")
+    if not regressions:
+        print(f"No regressions over {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", "-o", type=Path, help="save the results to this JSON file")
+    parser.add_argument("--baseline", "-b", type=Path, help="compare against the results saved in this JSON file")
+    parser.add_argument("--threshold", "-t", type=float, default=DEFAULT_THRESHOLD, help="regression threshold")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and a smaller synthetic form")
+    parser.add_argument("--filter", "-k", dest="pattern", help="only run benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+    return bench(args.output, args.baseline, args.threshold, args.quick, args.pattern)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Synthetic AcroForm documents for benchmarking, generated in memory with pypdf."""
+import io
+import os
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    FloatObject,
+    NameObject,
+    NumberObject,
+    TextStringObject,
+)
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+
+
+def _name(value):
+    return NameObject(value)
+
+
+def _appearance(writer, data=b""):
+    stream = DecodedStreamObject()
+    stream.update(
+        {
+            _name("/Type"): _name("/XObject"),
+            _name("/Subtype"): _name("/Form"),
+            _name("/BBox"): ArrayObject([NumberObject(0), NumberObject(0), NumberObject(10), NumberObject(10)]),
+        }
+    )
+    stream.set_data(data)
+    return writer._add_object(stream)
+
+
+def _rect(index, per_page):
+    columns = 4
+    row, column = divmod(index, columns)
+    rows = max(1, (per_page + columns - 1) // columns)
+    height = (PAGE_HEIGHT - 72) / rows
+    x = 36 + column * 140
+    y = PAGE_HEIGHT - 36 - (row + 1) * height
+    return ArrayObject([FloatObject(x), FloatObject(y), FloatObject(x + 130), FloatObject(y + min(height, 14))])
+
+
+def _image(writer, size):
+    side = max(1, int((size / 3) ** 0.5))
+    image = DecodedStreamObject()
+    image.update(
+        {
+            _name("/Type"): _name("/XObject"),
+            _name("/Subtype"): _name("/Image"),
+            _name("/Width"): NumberObject(side),
+            _name("/Height"): NumberObject(side),
+            _name("/ColorSpace"): _name("/DeviceRGB"),
+            _name("/BitsPerComponent"): NumberObject(8),
+        }
+    )
+    image.set_data(os.urandom(side * side * 3))
+    return writer._add_object(image)
+
+
+def make_form(pages=1, fields_per_page=20, checkbox_every=4, radio_groups_per_page=0, radio_options=4,
+              image_bytes_per_page=0) -> bytes:
+    """
+    Returns the bytes of a form with ``pages`` pages of ``fields_per_page`` widgets each.
+
+    Every ``checkbox_every``-th widget is a checkbox, the rest are text fields; fields are named ``field_<n>``.
+    Radio groups are named ``group_<n>`` with options ``Option 0`` .. ``Option <radio_options - 1>``.
+    ``image_bytes_per_page`` adds an incompressible image of roughly that size to every page.
+    """
+    writer = PdfWriter()
+    fields = ArrayObject()
+    on_state, off_state = _appearance(writer, b"0 0 m 10 10 l S"), _appearance(writer)
+    counter = 0
+    group_counter = 0
+    for page_number in range(pages):
+        page = writer.add_blank_page(PAGE_WIDTH, PAGE_HEIGHT)
+        annots = ArrayObject()
+        slots = fields_per_page + radio_groups_per_page * radio_options
+        slot = 0
+        for _ in range(fields_per_page):
+            widget = DictionaryObject(
+                {
+                    _name("/Type"): _name("/Annot"),
+                    _name("/Subtype"): _name("/Widget"),
+                    _name("/T"): TextStringObject(f"field_{counter}"),
+                    _name("/Rect"): _rect(slot, slots),
+                    _name("/P"): page.indirect_reference,
+                }
+            )
+            if checkbox_every and counter % checkbox_every == checkbox_every - 1:
+                widget[_name("/FT")] = _name("/Btn")
+                widget[_name("/AS")] = _name("/Off")
+                widget[_name("/AP")] = DictionaryObject(
+                    {_name("/N"): DictionaryObject({_name("/Yes"): on_state, _name("/Off"): off_state})}
+                )
+            else:
+                widget[_name("/FT")] = _name("/Tx")
+                widget[_name("/DA")] = TextStringObject("/Helv 10 Tf 0 g")
+            ref = writer._add_object(widget)
+            annots.append(ref)
+            fields.append(ref)
+            counter += 1
+            slot += 1
+        for _ in range(radio_groups_per_page):
+            kids = ArrayObject()
+            group = DictionaryObject(
+                {
+                    _name("/FT"): _name("/Btn"),
+                    _name("/Ff"): NumberObject(1 << 15),
+                    _name("/T"): TextStringObject(f"group_{group_counter}"),
+                    _name("/Kids"): kids,
+                }
+            )
+            group_ref = writer._add_object(group)
+            for option in range(radio_options):
+                state = _name(f"/Option {option}")
+                widget = DictionaryObject(
+                    {
+                        _name("/Type"): _name("/Annot"),
+                        _name("/Subtype"): _name("/Widget"),
+                        _name("/FT"): _name("/Btn"),
+                        _name("/Parent"): group_ref,
+                        _name("/AS"): _name("/Off"),
+                        _name("/Rect"): _rect(slot, slots),
+                        _name("/P"): page.indirect_reference,
+                        _name("/AP"): DictionaryObject(
+                            {_name("/N"): DictionaryObject({state: on_state, _name("/Off"): off_state})}
+                        ),
+                    }
+                )
+                ref = writer._add_object(widget)
+                kids.append(ref)
+                annots.append(ref)
+                slot += 1
+            fields.append(group_ref)
+            group_counter += 1
+        page[_name("/Annots")] = annots
+        if image_bytes_per_page:
+            page[_name("/Resources")] = DictionaryObject(
+                {_name("/XObject"): DictionaryObject({_name("/Im0"): _image(writer, image_bytes_per_page)})}
+            )
+            content = DecodedStreamObject()
+            content.set_data(f"q {PAGE_WIDTH} 0 0 {PAGE_HEIGHT} 0 0 cm /Im0 Do Q".encode())
+            page[_name("/Contents")] = writer._add_object(content)
+    writer._root_object[_name("/AcroForm")] = writer._add_object(
+        DictionaryObject({_name("/Fields"): fields})
+    )
+    with io.BytesIO() as buffer:
+        writer.write(buffer)
+        return buffer.getvalue()
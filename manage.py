@@ -40,5 +40,106 @@ def run_tests():
     subprocess.call(["mypy", "."])
 
 
+@tests.command()
+@click.argument("template", type=click.Path(exists=True, dir_okay=False))
+@click.argument("records", type=click.Path(exists=True, dir_okay=False))
+@click.option("--output-dir", "-o", required=True, type=click.Path(file_okay=False), help="Directory for filled PDFs")
+@click.option("--workers", "-w", type=int, default=None, help="Number of worker processes (default: CPU count)")
+@click.option("--id-field", default="id", show_default=True, help="CSV column/JSON key holding the record id")
+@click.option("--read-only", is_flag=True, help="Make filled fields read only")
+def fill_batch(template, records, output_dir, workers, id_field, read_only):
+    """Fill TEMPLATE once for every record in a RECORDS .csv or .jsonl file."""
+    from pdf_form.batch import fill_batch as run_batch, read_records
+
+    count = 0
+    start = time.perf_counter()
+    for _ in run_batch(template, read_records(records, id_field), workers, output_dir, read_only):
+        count += 1
+    print(f"Filled {count} records in {time.perf_counter() - start:.2f}s")
+
+
+@tests.command()
+@click.option("--output", "-o", type=click.Path(dir_okay=False), help="Save the results to this JSON file")
+@click.option("--baseline", "-b", type=click.Path(exists=True, dir_okay=False), help="Compare against saved results")
+@click.option("--threshold", "-t", type=float, default=0.1, show_default=True, help="Regression threshold (fraction)")
+@click.option("--quick", is_flag=True, help="Fewer repeats and a smaller synthetic form")
+@click.option("--filter", "-k", "pattern", help="Only run benchmarks whose name contains this")
+def bench(output, baseline, threshold, quick, pattern):
+    """Run the benchmark suite, failing on regressions against a baseline."""
+    from benchmarks.suite import bench as run_bench
+
+    raise SystemExit(run_bench(output, baseline, threshold, quick, pattern))
+
+
+@tests.command()
+@click.argument("template", type=click.Path(exists=True, dir_okay=False))
+@click.argument("records", type=click.Path(exists=True, dir_okay=False))
+@click.option("--output-dir", "-o", required=True, type=click.Path(file_okay=False), help="Directory for filled PDFs")
+@click.option("--shard", type=int, default=0, show_default=True, help="Index of the shard to run")
+@click.option("--shards", type=int, default=1, show_default=True, help="Number of shards the job is split into")
+@click.option("--workers", "-w", type=int, default=None, help="Number of worker processes (default: CPU count)")
+@click.option("--id-field", default="id", show_default=True, help="CSV column/JSON key holding the record id")
+@click.option("--read-only", is_flag=True, help="Make filled fields read only")
+def fill_job(template, records, output_dir, shard, shards, workers, id_field, read_only):
+    """Fill one shard of a resumable job over a RECORDS .csv or .jsonl file, skipping completed records."""
+    from pdf_form.batch import read_records
+    from pdf_form.jobs import run_job
+
+    start = time.perf_counter()
+    summary = run_job(template, read_records(records, id_field), output_dir, shard, shards, workers, read_only)
+    print(
+        f"Filled {summary.filled} records in {time.perf_counter() - start:.2f}s, skipped {summary.skipped} already "
+        f"completed and {summary.other_shards} of other shards"
+    )
+
+
+@tests.command()
+@click.argument("output_dir", type=click.Path(exists=True, file_okay=False))
+@click.option("--verify", is_flag=True, help="Also check every PDF against its checksum")
+def merge_manifests(output_dir, verify):
+    """Merge the shard manifests of a job's OUTPUT_DIR into its manifest.jsonl."""
+    from pdf_form.jobs import merge_manifests as merge, verify_outputs
+
+    print(f"{merge(output_dir)} records in {output_dir}/manifest.jsonl")
+    if verify:
+        failed = verify_outputs(output_dir)
+        for record_id in failed:
+            print(f"Missing or corrupt: {record_id}")
+        raise SystemExit(1 if failed else 0)
+
+
+@tests.command()
+@click.argument("templates", nargs=-1, required=True)
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to listen on")
+@click.option("--port", "-p", type=int, default=8765, show_default=True, help="Port to listen on")
+@click.option("--socket", "socket_path", type=click.Path(dir_okay=False), help="Listen on this Unix domain socket instead")
+@click.option("--workers", "-w", type=int, default=None, help="Number of workers (default: CPU count)")
+@click.option("--threads", is_flag=True, help="Fill in worker threads rather than processes")
+@click.option("--timeout", type=float, default=None, help="Seconds a request waits for its fill")
+@click.option("--verbose", "-v", is_flag=True, help="Log every request")
+def serve(templates, host, port, socket_path, workers, threads, timeout, verbose):
+    """Serve fills of preloaded TEMPLATES (NAME=PATH, or PATH named after its file name) until interrupted."""
+    import signal
+    from pathlib import Path
+
+    from pdf_form.daemon import FillService, make_server
+
+    named = {}
+    for template in templates:
+        name, _, path = template.rpartition("=")
+        named[name or Path(path).stem] = path
+    with FillService(named, "thread" if threads else "process", workers, timeout) as service:
+        server = make_server(service, host, port, socket_path, verbose)
+        print(f"Serving {', '.join(sorted(named))} on {server.address} with {service.max_workers} workers")
+        # shut down cleanly (removing the socket file) when stopped by a service manager too
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
 if __name__ == "__main__":
     tests()
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from pdf_form.batch import get_worker_template
+from pdf_form.template import FormTemplate
+
+
+TemplateType = Union[str, Path, FormTemplate]
+
+
+def _preload_templates(template_paths):
+    for template_path in template_paths:
+        get_worker_template(template_path)
+
+
+def _release(loop, semaphore):
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # the event loop was closed while the work was still running
+        pass
+
+
+def _fill(template, data, read_only):
+    if not isinstance(template, FormTemplate):
+        template = get_worker_template(template)
+    return template.fill(data, read_only=read_only)
+
+
+class AsyncFiller:
+    """
+    Fill forms from asyncio code without blocking the event loop.
+
+    The CPU work runs in a thread or process pool. Templates are loaded and indexed once per worker and kept there
+    (pass ``templates`` to load them when the pool starts rather than on first use).
+    :param executor: ``"thread"``, ``"process"``, or an existing ``concurrent.futures.Executor``
+    :param max_workers: size of the pool created for ``"thread"``/``"process"``
+    :param max_concurrency: maximum number of fills queued or running at once; further calls wait their turn
+    :param timeout: default per-call timeout in seconds
+    :param templates: template paths to preload in every worker
+    """
+
+    def __init__(
+        self,
+        executor: Union[str, Executor] = "thread",
+        max_workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        templates: Iterable[Union[str, Path]] = (),
+    ):
+        templates = tuple(str(template) for template in templates)
+        max_workers = max_workers or os.cpu_count() or 1
+        self._owns_executor = isinstance(executor, str)
+        if executor == "thread":
+            self._executor: Executor = ThreadPoolExecutor(max_workers)
+            _preload_templates(templates)
+        elif executor == "process":
+            self._executor = ProcessPoolExecutor(max_workers, initializer=_preload_templates, initargs=(templates,))
+            # start the workers now: forked later, they would inherit whatever sockets the service has open by then
+            self._executor.submit(int)
+        elif isinstance(executor, Executor):
+            self._executor = executor
+        else:
+            raise ValueError(f"Unknown executor: {executor}")
+        self._process = isinstance(self._executor, ProcessPoolExecutor)
+        self.max_concurrency = max_concurrency or 2 * max_workers
+        self.timeout = timeout
+        # one limiter per event loop, as asyncio primitives can't be shared between loops
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def fill(
+        self, template: TemplateType, data: dict, read_only: bool = False, timeout: Optional[float] = None
+    ) -> bytes:
+        """
+        Returns the bytes of ``template`` filled with ``data``.
+        Raises ``asyncio.TimeoutError`` if the fill hasn't finished within ``timeout`` (or the filler's default).
+        """
+        if self._process and isinstance(template, FormTemplate):
+            raise TypeError("process pool fills take a template path, not a FormTemplate")
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+
+        await semaphore.acquire()
+        try:
+            future = self._executor.submit(_fill, template, data, read_only)
+        except BaseException:
+            semaphore.release()
+            raise
+        # the slot is only freed once the work itself is done, not when a timed out caller stops waiting
+        future.add_done_callback(lambda _: _release(loop, semaphore))
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout if timeout is not None else self.timeout)
+
+    def close(self):
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        self.close()
+
+
+_default_filler: Optional[AsyncFiller] = None
+
+
+async def afill(template: TemplateType, data: dict, read_only: bool = False, timeout: Optional[float] = None) -> bytes:
+    """Fill a form on a shared, thread pool backed ``AsyncFiller``"""
+    global _default_filler
+    if _default_filler is None:
+        _default_filler = AsyncFiller()
+    return await _default_filler.fill(template, data, read_only, timeout)
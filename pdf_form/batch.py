@@ -0,0 +1,121 @@
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+from pdf_form.file_operations import write_bytes_atomic
+from pdf_form.template import FormTemplate
+
+
+Record = tuple[Any, dict]
+
+# templates loaded in this (worker) process, keyed by path
+_worker_templates: dict[str, FormTemplate] = {}
+
+
+def get_worker_template(template_path: Union[str, Path]) -> FormTemplate:
+    """Returns the FormTemplate for ``template_path``, loading and indexing it once per process"""
+    key = str(template_path)
+    template = _worker_templates.get(key)
+    if template is None:
+        template = _worker_templates[key] = FormTemplate(template_path)
+    return template
+
+
+def record_filename(record_id: Any) -> str:
+    """
+    The output file name of a record, ``<record_id>.pdf``.
+    :raises ValueError: if the id isn't usable as a single file name (e.g. ``../x`` or ``a/b``), as record ids come
+        from the records file and must not write outside the output directory
+    """
+    name = f"{record_id}.pdf"
+    text = str(record_id)
+    if (
+        text in ("", ".", "..")
+        or "\0" in text
+        or any(separator in text for separator in ("/", "\\", os.sep, os.altsep) if separator)
+        or Path(name).name != name
+    ):
+        raise ValueError(f"Record id {record_id!r} can't be used as a file name")
+    return name
+
+
+def _fill_record(template_path, record_id, data, read_only, output_dir):
+    if output_dir is None:
+        return record_id, get_worker_template(template_path).fill(data, read_only=read_only)
+    path = Path(output_dir) / record_filename(record_id)
+    pdf_bytes = get_worker_template(template_path).fill(data, read_only=read_only)
+    write_bytes_atomic(path, pdf_bytes)
+    return record_id, path
+
+
+def _ordered_results(executor: Executor, fn: Callable, calls: Iterable[tuple], max_in_flight: int) -> Iterator:
+    """
+    Results of ``fn(*args)`` for each ``args`` of ``calls``, submitted to ``executor`` with at most ``max_in_flight``
+    queued or running at once, in the order of ``calls``
+    """
+    in_flight: deque = deque()
+    for args in calls:
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+        in_flight.append(executor.submit(fn, *args))
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def fill_batch(
+    template_path: Union[str, Path],
+    records: Iterable[Record],
+    workers: Optional[int] = None,
+    output_dir: Optional[Union[str, Path]] = None,
+    read_only: bool = False,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[tuple[Any, Union[bytes, Path]]]:
+    """
+    Fill a form template once per record across a pool of worker processes.
+    :param template_path: path of the PDF form, loaded and indexed once in each worker
+    :param records: iterable of ``(record_id, data)`` pairs, consumed lazily
+    :param workers: number of worker processes (defaults to the number of CPUs)
+    :param output_dir: if given, each record is written (atomically) to ``<output_dir>/<record_id>.pdf`` by the
+        worker; ids that aren't a valid file name fail with a ValueError (see ``record_filename``)
+    :param read_only: set filled fields read only
+    :param max_in_flight: maximum number of records queued or being filled at once (defaults to ``2 * workers``)
+    :return: generator of ``(record_id, pdf_bytes)``, or ``(record_id, path)`` when ``output_dir`` is given,
+        in the same order as ``records``
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    if output_dir is not None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    with ProcessPoolExecutor(workers, initializer=get_worker_template, initargs=(template_path,)) as executor:
+        calls = ((template_path, record_id, data, read_only, output_dir) for record_id, data in records)
+        yield from _ordered_results(executor, _fill_record, calls, max_in_flight)
+
+
+def read_records(path: Union[str, Path], id_field: str = "id") -> Iterator[Record]:
+    """
+    Read ``(record_id, data)`` pairs from a ``.csv`` file (one record per row, header row of field names)
+    or a ``.jsonl`` file (one JSON object per line).
+    The ``id_field`` column/key is removed from the data and used as the record id; if it is missing, the record's
+    index in the file is used instead.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="") as f:
+            for index, row in enumerate(csv.DictReader(f)):
+                yield row.pop(id_field, index), row
+    elif path.suffix.lower() in (".jsonl", ".ndjson"):
+        with open(path) as f:
+            index = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                yield data.pop(id_field, index), data
+                index += 1
+    else:
+        raise ValueError(f"Unsupported records file type: {path.suffix}")
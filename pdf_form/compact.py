@@ -0,0 +1,167 @@
+"""
+Compact PDF output: identical objects merged, non-stream objects packed into compressed object streams, and a
+compressed cross-reference stream, at a selectable zlib level.
+"""
+import io
+import zlib
+from typing import IO, cast
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
+
+DEFAULT_COMPRESSION_LEVEL = 6
+OBJECTS_PER_STREAM = 100
+
+
+class _CountingOutput:
+    """Tracks the position of a stream that may not be seekable; pypdf only calls ``write``, ``tell`` and ``flush``"""
+
+    def __init__(self, stream: IO[bytes]):
+        self._stream = stream
+        self.position = 0
+
+    def write(self, data) -> int:
+        self._stream.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        self._stream.flush()
+
+
+def _compressed(stream: StreamObject, level: int) -> StreamObject:
+    """``stream`` itself if it already has a filter, or a Flate compressed copy of it"""
+    if "/Filter" in stream:
+        return stream
+    compressed = DecodedStreamObject()
+    compressed.update(stream)
+    compressed.set_data(zlib.compress(stream.get_data(), level))
+    compressed[NameObject("/Filter")] = NameObject("/FlateDecode")
+    return compressed
+
+
+def _stream_object(dictionary: DictionaryObject, data: bytes) -> bytes:
+    """A stream object's dictionary and data, serialised"""
+    dictionary[NameObject("/Length")] = NumberObject(len(data))
+    buffer = io.BytesIO()
+    dictionary.write_to_stream(buffer)
+    return buffer.getvalue() + b"\nstream\n" + data + b"\nendstream"
+
+
+def _object_stream(objects: list[tuple[int, object]], level: int) -> bytes:
+    offsets = []
+    body = io.BytesIO()
+    for idnum, obj in objects:
+        offsets.append(f"{idnum} {body.tell()}")
+        obj.write_to_stream(body)  # type: ignore[attr-defined]
+        body.write(b"\n")
+    header = (" ".join(offsets) + "\n").encode()
+    dictionary = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/ObjStm"),
+            NameObject("/N"): NumberObject(len(objects)),
+            NameObject("/First"): NumberObject(len(header)),
+            NameObject("/Filter"): NameObject("/FlateDecode"),
+        }
+    )
+    return _stream_object(dictionary, zlib.compress(header + body.getvalue(), level))
+
+
+def _field_width(value: int) -> int:
+    return max(1, (value.bit_length() + 7) // 8)
+
+
+def write_compact(
+    writer: PdfWriter,
+    stream: IO[bytes],
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+    deduplicate: bool = True,
+    objects_per_stream: int = OBJECTS_PER_STREAM,
+) -> int:
+    """
+    Write a PdfWriter in compact form and return the number of bytes written.
+
+    - With ``deduplicate``, identical objects (streams and dictionaries with the same hash, e.g. fonts or content
+      duplicated by ``manual_add_annotations``) are merged and unreferenced objects dropped first. This is done in
+      place on ``writer`` (``PdfWriter.compress_identical_objects``); the document itself doesn't change.
+    - Uncompressed streams are Flate compressed at ``compression_level``; streams that already have a filter are
+      copied as they are, without being decoded.
+    - Every other object is packed into object streams of up to ``objects_per_stream`` objects, indexed by a
+      cross-reference stream (PDF 1.5).
+
+    Encrypted writers are written as usual, without object streams.
+    :param compression_level: zlib level, from 0 (no compression, fastest) to 9 (smallest)
+    """
+    if writer._encryption is not None:
+        output = _CountingOutput(stream)
+        writer.write(cast(IO[bytes], output))
+        return output.position
+    if deduplicate:
+        writer.compress_identical_objects(remove_duplicates=True, remove_unreferenced=True)
+    writer._resolve_links()
+
+    output = _CountingOutput(stream)
+    header = max(writer.pdf_header, "%PDF-1.5")
+    output.write(header.encode() + b"\n%\xE2\xE3\xCF\xD3\n")
+
+    object_count = len(writer._objects)
+    # xref entries: (type, field 2, field 3) for objects 0 .. size - 1
+    entries: list[tuple[int, int, int]] = [(0, 0, 0xFFFF)] + [(0, 0, 0)] * object_count
+    packed: list[tuple[int, object]] = []
+    for idnum, obj in enumerate(writer._objects, start=1):
+        if obj is None:
+            continue
+        if isinstance(obj, StreamObject):
+            entries[idnum] = (1, output.position, 0)
+            output.write(f"{idnum} 0 obj\n".encode())
+            _compressed(obj, compression_level).write_to_stream(cast(IO[bytes], output))
+            output.write(b"\nendobj\n")
+        else:
+            packed.append((idnum, obj))
+
+    next_idnum = object_count + 1
+    for start in range(0, len(packed), objects_per_stream):
+        batch = packed[start:start + objects_per_stream]
+        stream_idnum = next_idnum
+        next_idnum += 1
+        entries.append((1, output.position, 0))
+        for index, (idnum, _) in enumerate(batch):
+            entries[idnum] = (2, stream_idnum, index)
+        output.write(f"{stream_idnum} 0 obj\n".encode() + _object_stream(batch, compression_level) + b"\nendobj\n")
+
+    xref_idnum = next_idnum
+    xref_location = output.position
+    entries.append((1, xref_location, 0))
+    widths = (1, _field_width(max(e[1] for e in entries)), _field_width(max(e[2] for e in entries)))
+    data = b"".join(
+        bytes((kind,)) + second.to_bytes(widths[1], "big") + third.to_bytes(widths[2], "big")
+        for kind, second, third in entries
+    )
+    trailer = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/XRef"),
+            NameObject("/Size"): NumberObject(xref_idnum + 1),
+            NameObject("/W"): ArrayObject(NumberObject(width) for width in widths),
+            NameObject("/Root"): writer.root_object.indirect_reference,
+            NameObject("/Filter"): NameObject("/FlateDecode"),
+        }
+    )
+    if writer._info is not None:
+        trailer[NameObject("/Info")] = writer._info.indirect_reference
+    if writer._ID is not None:
+        trailer[NameObject("/ID")] = writer._ID
+    output.write(
+        f"{xref_idnum} 0 obj\n".encode() + _stream_object(trailer, zlib.compress(data, compression_level))
+        + f"\nendobj\nstartxref\n{xref_location}\n%%EOF\n".encode()
+    )
+    return output.position
@@ -1,5 +1,8 @@
 from enum import Enum
 
+# US letter page size in points, as reportlab.lib.pagesizes.letter
+LETTER = (612.0, 792.0)
+
 
 class Markers(str, Enum):
     REMOVE = "__remove_annotation_from_pdf__"
@@ -15,6 +18,8 @@ class PdfDictKeys(str, Enum):
     SUBTYPE_KEY = "/Subtype"
     WIDGET_SUBTYPE = "/Widget"
     ANNOT_TYPE_KEY = "/FT"
+    TEXT_FIELD_TYPE = "/Tx"
+    CHECKBOX_FIELD_TYPE = "/Btn"
     CHECKBOX_VALUE_KEY = "/AS"
     TEXT_VALUE_KEY = "/V"
     PDF_DEFAULT_ANNOTATION_FONT = "Helv 10 Tf 0 0 0.75 rg"
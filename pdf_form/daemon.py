@@ -0,0 +1,286 @@
+"""
+Long-running fill daemon: templates are loaded and indexed once, then filled on request over HTTP, on a local port or
+a Unix domain socket.
+
+Endpoints:
+
+- ``POST /fill/<template>``: a JSON object of field values in, the filled PDF out (``?read_only=1`` makes the filled
+  fields read only)
+- ``GET /health``: ``{"status": "ok", "templates": [...], "workers": n}``
+- ``GET /stats``: request counts and the aggregated fill metrics as JSON, or in the Prometheus text format with
+  ``?format=prometheus``
+
+Use ``pdf_form.daemon_client.FillClient`` to talk to it, and ``python manage.py serve`` to run it.
+"""
+import http.server
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Mapping, Optional, Union
+
+from pdf_form.aio import _fill, _preload_templates
+from pdf_form.metrics import FillMetrics, MetricsRecorder, collect_metrics
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# largest request body accepted, in bytes
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+class UnknownTemplateError(LookupError):
+    pass
+
+
+def _fill_with_metrics(template_path: str, data: dict, read_only: bool) -> tuple[bytes, FillMetrics]:
+    with collect_metrics() as metrics:
+        pdf_bytes = _fill(template_path, data, read_only)
+    return pdf_bytes, metrics
+
+
+class FillService:
+    """
+    Named templates, preloaded in a pool of workers that is started up front, so no request pays for loading.
+
+    With the ``"process"`` executor each worker process holds its own copy of every template and fills run in
+    parallel. The ``"thread"`` executor shares one copy of each template between threads, so fills of the same
+    template run one at a time.
+    :param templates: template paths by the name requests use
+    :param executor: ``"process"`` or ``"thread"``
+    :param max_workers: size of the pool (defaults to the number of CPUs)
+    :param timeout: seconds a request waits for its fill before failing
+    """
+
+    def __init__(
+        self,
+        templates: Mapping[str, Union[str, Path]],
+        executor: str = "process",
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.templates = {name: str(path) for name, path in templates.items()}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        paths = tuple(self.templates.values())
+        # load every template here first: a broken template fails at startup, and forked workers inherit them
+        _preload_templates(paths)
+        if executor == "thread":
+            self._executor: Executor = ThreadPoolExecutor(self.max_workers)
+        elif executor == "process":
+            self._executor = ProcessPoolExecutor(self.max_workers, initializer=_preload_templates, initargs=(paths,))
+            for future in [self._executor.submit(int) for _ in range(self.max_workers)]:
+                future.result()
+        else:
+            raise ValueError(f"Unknown executor: {executor}")
+        self.executor = executor
+        self.metrics = MetricsRecorder()
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.fills_by_template = {name: 0 for name in self.templates}
+
+    def fill(self, name: str, data: dict, read_only: bool = False) -> bytes:
+        """
+        Returns the bytes of template ``name`` filled with ``data``.
+        :raises UnknownTemplateError: if there is no such template
+        :raises TimeoutError: if the fill took longer than the service's timeout
+        """
+        with self._lock:
+            self.requests += 1
+            if name not in self.templates:
+                self.errors += 1
+                raise UnknownTemplateError(name)
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(_fill_with_metrics, self.templates[name], data, read_only)
+            pdf_bytes, metrics = future.result(self.timeout)
+        except BaseException:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        self.metrics(metrics)
+        with self._lock:
+            self.fills_by_template[name] += 1
+        return pdf_bytes
+
+    def health(self) -> dict:
+        return {"status": "ok", "templates": sorted(self.templates), "workers": self.max_workers}
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "fills_by_template": dict(self.fills_by_template),
+            }
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "executor": self.executor,
+            "workers": self.max_workers,
+            **counts,
+            "metrics": self.metrics.as_dict(),
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "pdf-form-daemon"
+    server: Union["FillHTTPServer", "FillUnixServer"]
+
+    def address_string(self):
+        # Unix domain socket clients have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "local"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, value):
+        self._send(status, json.dumps(value).encode(), "application/json")
+
+    def _send_error(self, status: int, message: str):
+        self._send_json(status, {"error": message})
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        service = self.server.service
+        if url.path == "/health":
+            self._send_json(200, service.health())
+        elif url.path == "/stats":
+            if urllib.parse.parse_qs(url.query).get("format") == ["prometheus"]:
+                self._send(200, service.metrics.to_prometheus().encode(), "text/plain; version=0.0.4")
+            else:
+                self._send_json(200, service.stats())
+        else:
+            self._send_error(404, f"Not found: {url.path}")
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if not url.path.startswith("/fill/"):
+            self._send_error(404, f"Not found: {url.path}")
+            return
+        try:
+            length = int(self.headers["Content-Length"])
+        except (TypeError, ValueError):
+            length = -1
+        if length < 0:
+            # the body can't be skipped without its length, so the connection can't be reused either
+            self.close_connection = True
+            self._send_error(400, "Missing or invalid Content-Length")
+            return
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send_error(413, "Request body too large")
+            return
+        try:
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._send_error(400, f"Invalid JSON: {e}")
+            return
+        if not isinstance(data, dict):
+            self._send_error(400, "Request body must be a JSON object of field values")
+            return
+        name = urllib.parse.unquote(url.path[len("/fill/"):])
+        read_only = urllib.parse.parse_qs(url.query).get("read_only", ["0"])[0].lower() in ("1", "true", "yes")
+        try:
+            pdf_bytes = self.server.service.fill(name, data, read_only)
+        except UnknownTemplateError:
+            self._send_error(404, f"Unknown template: {name}")
+        except TimeoutError:
+            self._send_error(504, "Fill timed out")
+        except Exception as e:
+            self._send_error(500, f"{type(e).__name__}: {e}")
+        else:
+            self._send(200, pdf_bytes, "application/pdf")
+
+
+class FillHTTPServer(http.server.ThreadingHTTPServer):
+    def __init__(self, service: FillService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, verbose=False):
+        self.service = service
+        self.verbose = verbose
+        super().__init__((host, port), _Handler)
+
+    @property
+    def address(self) -> str:
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+
+class FillUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, service: FillService, socket_path: Union[str, Path], verbose=False):
+        self.service = service
+        self.verbose = verbose
+        self.socket_path = str(socket_path)
+        _remove_stale_socket(self.socket_path)
+        super().__init__(self.socket_path, _Handler)
+
+    @property
+    def address(self) -> str:
+        return f"unix://{self.socket_path}"
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path: str):
+    """Remove the socket file left by a daemon that didn't shut down cleanly, but not one that is still serving"""
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+        else:
+            raise OSError(f"A server is already listening on {socket_path}")
+
+
+def make_server(
+    service: FillService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[Union[str, Path]] = None,
+    verbose=False,
+) -> Union[FillHTTPServer, FillUnixServer]:
+    """
+    An HTTP server for ``service``, on ``socket_path`` if given, or on ``host``/``port`` otherwise (port 0 picks a free
+    port). Serve with ``serve_forever()``, in a thread if needed, and stop with ``shutdown()`` and ``server_close()``.
+    """
+    if socket_path is not None:
+        return FillUnixServer(service, socket_path, verbose)
+    return FillHTTPServer(service, host, port, verbose)
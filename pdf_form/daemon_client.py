@@ -0,0 +1,89 @@
+"""
+Client of the fill daemon (``pdf_form.daemon``), using only the standard library so callers don't pay for importing
+pypdf.
+"""
+import http.client
+import json
+import socket
+import urllib.parse
+from typing import Optional
+
+
+class FillServiceError(Exception):
+    """An error response of the fill daemon"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class FillClient:
+    """
+    Fills forms through a running fill daemon, over a single kept-alive connection (use one client per thread).
+    :param address: ``http://host:port`` or ``unix:///path/to/socket``
+    :param timeout: socket timeout in seconds
+    """
+
+    def __init__(self, address: str, timeout: Optional[float] = 30.0):
+        url = urllib.parse.urlsplit(address)
+        if url.scheme == "unix":
+            self._connection: http.client.HTTPConnection = _UnixHTTPConnection(url.path, timeout)
+        elif url.scheme == "http":
+            self._connection = http.client.HTTPConnection(url.hostname or "localhost", url.port, timeout=timeout)
+        else:
+            raise ValueError(f"Unsupported fill daemon address: {address}")
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> tuple[str, bytes]:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        # a kept-alive connection may have been closed by the daemon since the last request: reconnect once
+        for attempt in range(2):
+            try:
+                self._connection.request(method, path, body, headers)
+                response = self._connection.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.RemoteDisconnected):
+                self._connection.close()
+                if attempt:
+                    raise
+        if response.status != 200:
+            try:
+                message = json.loads(data)["error"]
+            except (ValueError, KeyError, TypeError):
+                message = data.decode(errors="replace")
+            raise FillServiceError(response.status, message)
+        return response.getheader("Content-Type", ""), data
+
+    def fill(self, template: str, data: dict, read_only: bool = False) -> bytes:
+        """Returns the bytes of the daemon's ``template`` filled with ``data``"""
+        path = f"/fill/{urllib.parse.quote(template, safe='')}" + ("?read_only=1" if read_only else "")
+        return self._request("POST", path, json.dumps(data).encode())[1]
+
+    def health(self) -> dict:
+        return json.loads(self._request("GET", "/health")[1])
+
+    def stats(self) -> dict:
+        return json.loads(self._request("GET", "/stats")[1])
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -1,21 +1,62 @@
+import contextvars
 import io
+import mmap
+import os
+import queue
+import re
+import struct
+import threading
+import zlib
 from pathlib import Path
-from typing import Union, IO
+from typing import Iterable, Iterator, Optional, Union, IO, cast
 
 from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, NameObject, NumberObject, PdfObject, StreamObject
+
+from pdf_form.compact import DEFAULT_COMPRESSION_LEVEL, write_compact
+from pdf_form.metrics import current_metrics, stage
 
 
 GenericPdfType = Union[PdfReader, PdfWriter]
 
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def load_pdf(file: Union[str, Path, IO[bytes]], use_mmap: bool = False) -> PdfReader:
+    """
+    :param file: path or binary file object of the PDF
+    :param use_mmap: memory-map the file (a path, or a file object with a ``fileno``) and parse straight from the
+        mapping instead of reading it into memory. The bytes are then backed by the OS page cache and shared by every
+        process mapping the same file, and ``write_pdf_to_stream``/``write_pdf_incremental`` copy the unchanged
+        bytes of a reader from the mapping. Only the objects that are actually parsed are copied into the process.
+        Files that can't be mapped (empty files, in-memory file objects) are read as usual.
+    """
+    with stage("load"):
+        mapping = _map_file(file) if use_mmap else None
+        if mapping is not None:
+            # PdfReader only needs the read/seek/tell an mmap provides
+            return PdfReader(cast(IO[bytes], mapping))
+        return PdfReader(file)
+
 
-def load_pdf(file: Union[str, Path, IO[bytes]]) -> PdfReader:
-    return PdfReader(file)
+def _map_file(file: Union[str, Path, IO[bytes]]) -> Optional[mmap.mmap]:
+    """A read-only mapping of the file, or None if it can't be mapped"""
+    try:
+        if isinstance(file, (str, Path)):
+            with open(file, "rb") as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # the mapping stays valid after the file is closed
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # empty files, file objects without a file descriptor (io.UnsupportedOperation) and unmappable files (pipes)
+        return None
 
 
 def _get_writer_from_pdf_object(pdf: GenericPdfType) -> PdfWriter:
     if isinstance(pdf, PdfReader):
-        writer = PdfWriter()
-        writer.clone_document_from_reader(pdf)
+        with stage("clone"):
+            writer = PdfWriter()
+            writer.clone_document_from_reader(pdf)
     elif isinstance(pdf, PdfWriter):
         writer = pdf
     else:
@@ -23,14 +64,344 @@ def _get_writer_from_pdf_object(pdf: GenericPdfType) -> PdfWriter:
     return writer
 
 
-def write_pdf_to_file(pdf: GenericPdfType, filename) -> None:
+def _record_output_bytes(size: int):
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.output_bytes += size
+
+
+def _write(writer: PdfWriter, stream, compact: bool, compression_level: int):
+    if compact:
+        write_compact(writer, stream, compression_level)
+    else:
+        writer.write(stream)
+
+
+def write_pdf_to_file(
+    pdf: GenericPdfType, filename, compact: bool = False, compression_level: int = DEFAULT_COMPRESSION_LEVEL
+) -> None:
+    """
+    :param compact: merge identical objects and write object streams and a cross-reference stream
+        (see ``pdf_form.compact.write_compact``)
+    :param compression_level: zlib level of the compact output, from 0 (fastest) to 9 (smallest)
+    """
     writer = _get_writer_from_pdf_object(pdf)
-    with open(filename, "wb") as f:
-        writer.write(f)
+    with stage("write"), open(filename, "wb") as f:
+        _write(writer, f, compact, compression_level)
+        _record_output_bytes(f.tell())
 
 
-def write_pdf_to_bytes(pdf: GenericPdfType) -> bytes:
+def write_pdf_to_bytes(
+    pdf: GenericPdfType, compact: bool = False, compression_level: int = DEFAULT_COMPRESSION_LEVEL
+) -> bytes:
+    """Same as ``write_pdf_to_file``, returning the bytes"""
     writer = _get_writer_from_pdf_object(pdf)
+    with stage("write"), io.BytesIO() as buffer:
+        _write(writer, buffer, compact, compression_level)
+        _record_output_bytes(buffer.tell())
+        return buffer.getvalue()
+
+
+def write_bytes_atomic(path: Union[str, Path], data: bytes) -> None:
+    """
+    Write ``data`` to ``path`` through a temporary file in the same directory, synced and then renamed over ``path``:
+    readers and restarted jobs see either the previous file or the complete new one, never a partial write.
+    """
+    path = Path(path)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temporary, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+class _ChunkedOutput:
+    """
+    Write-only file object handed to ``PdfWriter.write``: keeps track of the position (``tell``) itself, so the
+    destination doesn't need to be seekable, and passes data on in chunks of ``chunk_size`` bytes.
+    """
+
+    def __init__(self, emit, chunk_size: int):
+        self._emit = emit
+        self._chunk_size = chunk_size
+        self._chunk = bytearray()
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._position += len(data)
+        if not self._chunk and len(data) >= self._chunk_size:
+            # pass large writes (e.g. views of a memory-mapped source) on as they are, without buffering a copy
+            self._emit(data)
+            return len(data)
+        self._chunk += data
+        if len(self._chunk) >= self._chunk_size:
+            self.flush()
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        if self._chunk:
+            self._emit(bytes(self._chunk))
+            self._chunk.clear()
+
+
+def _iter_reader_chunks(reader: PdfReader, chunk_size: int, copy: bool = True) -> Iterator[bytes]:
+    """
+    The bytes a PdfReader was loaded from. Without ``copy``, chunks of a memory-mapped source (see ``load_pdf``) are
+    ``memoryview`` slices of the mapping rather than copies.
+    """
+    source = reader.stream
+    if isinstance(source, mmap.mmap) and not copy:
+        view = memoryview(source)
+        for position in range(0, len(view), chunk_size):
+            yield view[position:position + chunk_size]  # type: ignore[misc]
+        return
+    position = 0
+    while True:
+        # pypdf moves the stream position while lazily parsing, so don't rely on it between reads
+        source.seek(position)
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        position += len(chunk)
+        yield chunk
+
+
+def write_pdf_to_stream(
+    pdf: GenericPdfType,
+    stream: IO[bytes],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compact: bool = False,
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+) -> None:
+    """
+    Write a PDF to any writable binary stream (file, socket file, HTTP response...), in chunks of ``chunk_size``
+    bytes as the document is serialised. The stream doesn't need to support ``seek`` or ``tell``.
+    ``compact`` and ``compression_level`` are as in ``write_pdf_to_file``.
+
+    A PdfReader isn't cloned into a PdfWriter (unless ``compact`` is set): its original bytes are written followed by
+    an incremental update with every object it has parsed, so changes made to them in memory (e.g. by
+    ``update_pdf_form_fields_from_dict``) are included.
+    """
+    with stage("write"):
+        if isinstance(pdf, PdfReader) and not compact:
+            size = _write_update_section(pdf, _parsed_objects(pdf), stream.write, chunk_size)
+        else:
+            output = _ChunkedOutput(stream.write, chunk_size)
+            _write(_get_writer_from_pdf_object(pdf), output, compact, compression_level)
+            output.flush()
+            size = output.tell()
+    _record_output_bytes(size)
+    if hasattr(stream, "flush"):
+        stream.flush()
+
+
+def _parsed_objects(reader: PdfReader) -> dict[int, tuple[int, PdfObject]]:
+    """
+    The indirect objects of ``reader`` parsed so far, by object number: the only ones changes in memory can have been
+    made to. Object streams, cross-reference streams and the encryption dictionary are left as they are.
+    """
+    encrypt = reader.trailer.raw_get("/Encrypt") if "/Encrypt" in reader.trailer else None
+    objects = {}
+    for (generation, idnum), obj in reader.resolved_objects.items():
+        if obj is None or (encrypt is not None and getattr(encrypt, "idnum", None) == idnum):
+            continue
+        if isinstance(obj, StreamObject) and obj.get("/Type") in ("/ObjStm", "/XRef"):
+            continue
+        objects[idnum] = (generation, obj)
+    return objects
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def iter_pdf_chunks(pdf: GenericPdfType, chunk_size: int = DEFAULT_CHUNK_SIZE, max_buffered: int = 4) -> Iterator[bytes]:
+    """
+    Generator of the bytes of a PDF in chunks of about ``chunk_size`` bytes, e.g. for a chunked HTTP response.
+    The document is serialised on a background thread, at most ``max_buffered`` chunks ahead of the consumer.
+    A PdfReader is written without being cloned, as in ``write_pdf_to_stream``.
+    """
+    if not isinstance(pdf, PdfReader):
+        pdf = _get_writer_from_pdf_object(pdf)
+    chunks: queue.Queue = queue.Queue(max_buffered)
+    cancelled = threading.Event()
+    done = object()
+
+    def emit(chunk):
+        while not cancelled.is_set():
+            try:
+                chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Cancelled
+
+    def produce():
+        try:
+            with stage("write"):
+                if isinstance(pdf, PdfReader):
+                    # chunks outlive this thread's write, so they are copied out of a memory-mapped source
+                    size = _write_update_section(pdf, _parsed_objects(pdf), emit, chunk_size, copy=True)
+                else:
+                    output = _ChunkedOutput(emit, chunk_size)
+                    pdf.write(output)
+                    output.flush()
+                    size = output.tell()
+            _record_output_bytes(size)
+            emit(done)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            try:
+                emit(e)
+            except _Cancelled:
+                pass
+
+    # run in a copy of this context, so the write is recorded in the caller's metrics
+    context = contextvars.copy_context()
+    producer = threading.Thread(target=context.run, args=(produce,), name="pdf-form-writer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                break
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield chunk
+    finally:
+        cancelled.set()
+        producer.join()
+
+
+def _find_startxref(reader: PdfReader) -> int:
+    source = reader.stream
+    source.seek(0, io.SEEK_END)
+    size = source.tell()
+    source.seek(max(0, size - 1024))
+    match = re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", source.read())
+    if match is None:
+        raise ValueError("Could not find the startxref of the original document")
+    return int(match.group(1))
+
+
+def _uses_xref_stream(reader: PdfReader, startxref: int) -> bool:
+    reader.stream.seek(startxref)
+    return not reader.stream.read(4) == b"xref"
+
+
+def _xref_subsections(idnums: list[int]) -> list[tuple[int, int]]:
+    subsections: list[tuple[int, int]] = []
+    for idnum in idnums:
+        if subsections and subsections[-1][0] + subsections[-1][1] == idnum:
+            subsections[-1] = (subsections[-1][0], subsections[-1][1] + 1)
+        else:
+            subsections.append((idnum, 1))
+    return subsections
+
+
+def write_pdf_incremental(
+    reader: PdfReader, objects: Iterable[PdfObject], stream: IO[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> None:
+    """
+    Write the original bytes of ``reader`` followed by an incremental update section holding only ``objects``.
+    :param reader: the document as loaded, whose objects have been modified in place
+        (e.g. by ``update_pdf_form_fields_from_dict(reader, data)``)
+    :param objects: the modified indirect objects of ``reader`` (e.g. as returned by
+        ``update_pdf_form_fields_from_dict``)
+    :param stream: any writable binary stream
+    """
+    changed = {}
+    for obj in objects:
+        ref = getattr(obj, "indirect_reference", None)
+        if ref is None or ref.pdf is not reader:
+            raise ValueError("Only indirect objects of the reader can be written incrementally")
+        changed[ref.idnum] = (ref.generation, obj)
+    with stage("write"):
+        size = _write_update_section(reader, changed, stream.write, chunk_size)
+    _record_output_bytes(size)
+    if hasattr(stream, "flush"):
+        stream.flush()
+
+
+def _write_update_section(reader: PdfReader, changed: dict, write, chunk_size: int, copy: bool = False) -> int:
+    """
+    Write the original bytes of ``reader`` and an update section with the objects of ``changed``
+    (``{idnum: (generation, object)}``) through ``write``, returning the number of bytes written
+    """
+    startxref = _find_startxref(reader)
+    xref_stream = _uses_xref_stream(reader, startxref)
+    encryption = getattr(reader, "_encryption", None)
+
+    output = _ChunkedOutput(write, chunk_size)
+    # pypdf's write_to_stream only calls write()
+    object_output = cast(IO[bytes], output)
+    for chunk in _iter_reader_chunks(reader, chunk_size, copy):
+        output.write(chunk)
+    output.write(b"\n")
+
+    offsets = {}
+    for idnum in sorted(changed):
+        generation, obj = changed[idnum]
+        if encryption is not None:
+            obj = encryption.encrypt_object(obj, idnum, generation)
+        offsets[idnum] = output.tell()
+        output.write(f"{idnum} {generation} obj\n".encode())
+        obj.write_to_stream(object_output)
+        output.write(b"\nendobj\n")
+
+    size = max(int(reader.trailer.get("/Size", 0)), max(offsets, default=0) + 1)
+    trailer = DictionaryObject()
+    for key in ("/Root", "/Info", "/ID", "/Encrypt"):
+        if key in reader.trailer:
+            trailer[NameObject(key)] = reader.trailer.raw_get(key)
+    trailer[NameObject("/Prev")] = NumberObject(startxref)
+    entries = {idnum: (offset, changed[idnum][0]) for idnum, offset in offsets.items()}
+
+    xref_location = output.tell()
+    if xref_stream:
+        # the cross-reference stream is a new object, numbered after all existing ones, with an entry of its own
+        entries[size] = (xref_location, 0)
+        subsections = _xref_subsections(sorted(entries))
+        trailer.update(
+            {
+                NameObject("/Type"): NameObject("/XRef"),
+                NameObject("/Size"): NumberObject(size + 1),
+                NameObject("/Index"): ArrayObject(NumberObject(n) for subsection in subsections for n in subsection),
+                NameObject("/W"): ArrayObject([NumberObject(1), NumberObject(4), NumberObject(2)]),
+                NameObject("/Filter"): NameObject("/FlateDecode"),
+            }
+        )
+        data = zlib.compress(b"".join(struct.pack(">BIH", 1, *entries[idnum]) for idnum in sorted(entries)))
+        trailer[NameObject("/Length")] = NumberObject(len(data))
+        output.write(f"{size} 0 obj\n".encode())
+        trailer.write_to_stream(object_output)
+        output.write(b"\nstream\n" + data + b"\nendstream\nendobj\n")
+    else:
+        trailer[NameObject("/Size")] = NumberObject(size)
+        output.write(b"xref\n")
+        for first, count in _xref_subsections(sorted(entries)):
+            output.write(f"{first} {count}\n".encode())
+            for idnum in range(first, first + count):
+                offset, generation = entries[idnum]
+                output.write(f"{offset:010d} {generation:05d} n\r\n".encode())
+        output.write(b"trailer\n")
+        trailer.write_to_stream(object_output)
+        output.write(b"\n")
+    output.write(f"startxref\n{xref_location}\n%%EOF\n".encode())
+    output.flush()
+    return output.tell()
+
+
+def write_pdf_incremental_to_bytes(reader: PdfReader, objects: Iterable[PdfObject]) -> bytes:
     with io.BytesIO() as buffer:
-        writer.write(buffer)
+        write_pdf_incremental(reader, objects, buffer)
         return buffer.getvalue()
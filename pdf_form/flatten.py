@@ -0,0 +1,192 @@
+"""
+Flattening: bake form field values into the page content and remove the interactive form.
+"""
+import re
+from typing import Optional, cast
+
+from pypdf import PdfWriter
+from pypdf.generic import ArrayObject, IndirectObject, NameObject, StreamObject
+
+from pdf_form.constants import PdfDictKeys
+from pdf_form.metrics import stage
+from pdf_form.native_overlay import (
+    _number,
+    add_font_resource,
+    add_page_resource,
+    append_page_content,
+    pdf_literal_string,
+)
+
+FLATTENED_XOBJECT_PREFIX = "/PdfFormFlat"
+FLATTENED_FONT = "Helvetica"
+# annotation flags (/F) of widgets that aren't displayed
+_HIDDEN_FLAGS = 1 << 1 | 1 << 5
+# field flags (/Ff) of text fields
+_MULTILINE_FLAG = 1 << 12
+_PASSWORD_FLAG = 1 << 13
+# padding inside a text field's rect, and the largest font size used for auto-sized (size 0) text
+TEXT_PADDING = 2
+MAX_AUTO_FONT_SIZE = 12
+
+_FONT_SIZE = re.compile(r"(\d*\.?\d+)\s+Tf\b")
+_RGB_COLOR = re.compile(r"(\d*\.?\d+)\s+(\d*\.?\d+)\s+(\d*\.?\d+)\s+rg\b")
+_GRAY_COLOR = re.compile(r"(\d*\.?\d+)\s+g\b")
+
+
+def _inherited(annot, key):
+    """A field attribute of a widget, looked up through its /Parent fields"""
+    node = annot
+    seen = set()
+    while node is not None and id(node) not in seen:
+        seen.add(id(node))
+        if key in node:
+            return node[key]
+        parent = node.get(PdfDictKeys.PARENT_KEY.value)
+        node = parent.get_object() if parent is not None else None
+    return None
+
+
+def _text_style(default_appearance: str) -> tuple[float, tuple[float, float, float]]:
+    """Font size (0 for auto) and fill colour of a /DA string, e.g. ``/Helv 10 Tf 0 0 0.75 rg``"""
+    size = _FONT_SIZE.search(default_appearance)
+    rgb = _RGB_COLOR.search(default_appearance)
+    gray = _GRAY_COLOR.search(default_appearance)
+    if rgb is not None:
+        color = tuple(float(c) for c in rgb.groups())
+    elif gray is not None:
+        color = (float(gray.group(1)),) * 3
+    else:
+        color = (0.0, 0.0, 0.0)
+    return float(size.group(1)) if size else 0.0, color  # type: ignore[return-value]
+
+
+def text_field_operators(
+    rect: tuple[float, float, float, float], text: str, font_resource: str, default_appearance: str, multiline=False
+) -> bytes:
+    """
+    Page content operators drawing a text field's value in its rect, clipped to it: left aligned, vertically
+    centred for single line fields and from the top for multi-line fields, in the size and colour of ``/DA``.
+    """
+    x0, y0, x1, y1 = rect
+    width, height = x1 - x0, y1 - y0
+    font_size, color = _text_style(default_appearance)
+    lines = text.splitlines() if multiline else [" ".join(text.splitlines())]
+    if not font_size:
+        font_size = max(1.0, min(MAX_AUTO_FONT_SIZE, height - 2 * TEXT_PADDING))
+    if multiline:
+        first_baseline = y1 - TEXT_PADDING - font_size
+    else:
+        first_baseline = y0 + (height - font_size) / 2 + 0.22 * font_size
+    operators = [
+        f"q {_number(x0)} {_number(y0)} {_number(width)} {_number(height)} re W n".encode(),
+        f"BT {font_resource} {_number(font_size)} Tf {' '.join(map(_number, color))} rg".encode(),
+    ]
+    for i, line in enumerate(lines):
+        baseline = first_baseline - i * font_size
+        operators.append(
+            f"1 0 0 1 {_number(x0 + TEXT_PADDING)} {_number(baseline)} Tm ".encode() + pdf_literal_string(line) + b" Tj"
+        )
+    operators.append(b"ET Q")
+    return b"\n".join(operators)
+
+
+def _normal_appearance(annot):
+    """Reference to the normal appearance stream a widget currently shows, if any"""
+    appearances = annot.get(PdfDictKeys.CHECKBOX_VALUES_KEY.value)
+    if appearances is None:
+        return None
+    appearances = appearances.get_object()
+    normal = appearances.get(PdfDictKeys.POSITIVE_VALUES_KEY.value)
+    if normal is None:
+        return None
+    if isinstance(normal.get_object(), StreamObject):
+        return appearances.raw_get(PdfDictKeys.POSITIVE_VALUES_KEY.value)
+    state = annot.get(PdfDictKeys.CHECKBOX_VALUE_KEY.value)
+    normal = normal.get_object()
+    if state is None or state not in normal:
+        return None
+    return normal.raw_get(state)
+
+
+def appearance_operators(form: StreamObject, rect: tuple[float, float, float, float], name: str) -> bytes:
+    """
+    Page content operators painting a form XObject (appearance stream) into ``rect``: its bounding box, after its
+    own /Matrix, is scaled and moved onto the rect, as viewers do for annotation appearances.
+    """
+    bbox = [float(v) for v in form.get("/BBox", [0, 0, 1, 1])]
+    a, b, c, d, e, f = (float(v) for v in form.get("/Matrix", [1, 0, 0, 1, 0, 0]))
+    corners = [(x * a + y * c + e, x * b + y * d + f) for x in (bbox[0], bbox[2]) for y in (bbox[1], bbox[3])]
+    box_x0, box_x1 = min(x for x, _ in corners), max(x for x, _ in corners)
+    box_y0, box_y1 = min(y for _, y in corners), max(y for _, y in corners)
+    x0, y0, x1, y1 = rect
+    scale_x = (x1 - x0) / (box_x1 - box_x0) if box_x1 != box_x0 else 1.0
+    scale_y = (y1 - y0) / (box_y1 - box_y0) if box_y1 != box_y0 else 1.0
+    matrix = (scale_x, 0, 0, scale_y, x0 - box_x0 * scale_x, y0 - box_y0 * scale_y)
+    return f"q {' '.join(map(_number, matrix))} cm {name} Do Q".encode()
+
+
+def _flatten_page(writer: PdfWriter, page, default_appearance: str):
+    annotations = page.get(PdfDictKeys.ANNOTATION_KEY.value)
+    if not annotations:
+        return
+    kept = ArrayObject()
+    operators = []
+    font_resource: Optional[str] = None
+    for ref in annotations.get_object():
+        annot = ref.get_object()
+        if annot.get(PdfDictKeys.SUBTYPE_KEY.value) != PdfDictKeys.WIDGET_SUBTYPE:
+            kept.append(ref)
+            continue
+        rect = annot.get("/Rect")
+        # widgets without a /Rect were removed with Markers.REMOVE
+        if rect is None or int(annot.get("/F", 0)) & _HIDDEN_FLAGS:
+            continue
+        x0, y0, x1, y1 = (float(v) for v in rect)
+        rect = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+
+        if _inherited(annot, PdfDictKeys.ANNOT_TYPE_KEY.value) == PdfDictKeys.TEXT_FIELD_TYPE:
+            # filling only sets /V, so text appearances are always generated from the value
+            value = _inherited(annot, PdfDictKeys.TEXT_VALUE_KEY.value)
+            flags = int(_inherited(annot, "/Ff") or 0)
+            if not value or flags & _PASSWORD_FLAG:
+                continue
+            if font_resource is None:
+                font_resource = add_font_resource(writer, page, FLATTENED_FONT)
+            da = _inherited(annot, "/DA") or default_appearance
+            operators.append(text_field_operators(rect, str(value), font_resource, da, bool(flags & _MULTILINE_FLAG)))
+            continue
+
+        appearance = _normal_appearance(annot)
+        if appearance is None:
+            continue
+        if not isinstance(appearance, IndirectObject):
+            appearance = writer._add_object(appearance)
+        name = f"{FLATTENED_XOBJECT_PREFIX}{len(operators)}"
+        add_page_resource(page, "/XObject", name, appearance)
+        operators.append(appearance_operators(cast(StreamObject, appearance.get_object()), rect, name))
+
+    if operators:
+        append_page_content(writer, page, b"\n".join(operators))
+    if kept:
+        page[NameObject(PdfDictKeys.ANNOTATION_KEY.value)] = kept
+    else:
+        del page[PdfDictKeys.ANNOTATION_KEY.value]
+
+
+def flatten_form(writer: PdfWriter) -> PdfWriter:
+    """
+    Make a filled form non-editable: draw every visible widget into its page's content and remove the widgets and
+    the AcroForm.
+    Text fields are drawn from their value (in the standard Helvetica font, with the size and colour of their /DA);
+    checkboxes, radio buttons and other widgets are drawn from the appearance stream of their current state.
+    Each page gets a single appended content stream.
+    :param writer: the filled form
+    :return: the same PdfWriter, flattened
+    """
+    with stage("flatten"):
+        acro_form = writer.root_object.get("/AcroForm")
+        default_appearance = str(acro_form.get_object().get("/DA", "")) if acro_form is not None else ""
+        for page in writer.pages:
+            _flatten_page(writer, page, default_appearance)
+        writer.root_object.pop("/AcroForm", None)
+    return writer
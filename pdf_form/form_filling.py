@@ -1,5 +1,4 @@
-import io
-import re
+import functools
 import logging
 import urllib.parse
 from dataclasses import dataclass
@@ -8,18 +7,17 @@ from pathlib import Path
 from typing import Optional, Union
 
 from pypdf import PdfReader, PdfWriter
-from pypdf.generic import NameObject, NumberObject, TextStringObject
-from reportlab.lib.pagesizes import letter   # type: ignore
-from reportlab.pdfgen import canvas  # type: ignore
+from pypdf.generic import BooleanObject, DictionaryObject, IndirectObject, NameObject, NumberObject, TextStringObject
 
 from pdf_form.file_operations import load_pdf
-from pdf_form.constants import Markers, PdfDictKeys
+from pdf_form.metrics import current_metrics, stage, timed_annotations
+from pdf_form.native_overlay import add_text_overlay
+from pdf_form.constants import LETTER, Markers, PdfDictKeys
 
 
 int_or_float = Union[int, float]
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 @dataclass
 class DefaultSettings:
@@ -34,70 +32,59 @@ DEFAULT_SETTINGS = DefaultSettings()
 def manual_add_annotations(
     original_writer: PdfWriter,
     data_dict: dict[tuple[float, float, int], Optional[str]],
-    page_size: tuple[float, float] = letter,
+    page_size: tuple[float, float] = LETTER,
+    engine: str = "reportlab",
 ) -> PdfWriter:
     """
     Add text manually to a PDF at the given coordinates (bottom right coordinate of annotation rect).
+    With the ``reportlab`` engine, all overlay pages are drawn on a single reportlab canvas, parsed once, and merged
+    into the writer's pages in place (reportlab is only imported on first use). The ``native`` engine instead appends
+    the text drawing operators directly to each page's /Contents, using a single shared standard font resource.
     :param original_writer: PdfWriter object already containing pages from original PDF
     :param data_dict: dict of annotations to add to the PDF, key is tuple of coordinates: ``(x, y, page_index)``
-    :param page_size: page size of original file
-    :return: PdfWriter made from original, with annotations added to page(s) specified in data_dict
+    :param page_size: page size of original file (reportlab engine only)
+    :param engine: ``"reportlab"`` or ``"native"``
+    :return: the same PdfWriter, with annotations added to page(s) specified in data_dict
     """
+    if engine not in ("reportlab", "native"):
+        raise ValueError(f"Unknown overlay engine: {engine}")
 
     if not data_dict:
         return original_writer
 
+    with stage("manual_annotations"):
+        _add_annotations(original_writer, data_dict, page_size, engine)
+    return original_writer
+
+
+def _add_annotations(original_writer, data_dict, page_size, engine):
     font_name = DEFAULT_SETTINGS.font_name
     font_size = DEFAULT_SETTINGS.font_size
     font_rgb = DEFAULT_SETTINGS.font_rgb
 
-    pages = {x[2] for x in data_dict.keys()}
-    page_map = {}
-    for p in pages:
-        packet = io.BytesIO()
-        new_page = canvas.Canvas(packet, pagesize=page_size)
-        for annotation_coords, annotation_text in data_dict.items():
-            x, y, page_number = annotation_coords
-            if page_number != p:
-                continue
-            if annotation_text is None:
-                continue
-            new_page.setFont(font_name, font_size)
-            new_page.setFillColorRGB(*font_rgb)
-            new_line_offset = font_size
-            annotation_lines = annotation_text.split("\n")
-            for i, line in enumerate(reversed(annotation_lines)):
-                y = y + new_line_offset * i
-                new_page.drawString(x, y, line)
-        new_page.save()
-        packet.seek(0)
-        new_page_pdf_reader = PdfReader(packet)
-
-        # get page from existing pdf object and merge appropriate page with pdf page created above
-        page = original_writer.pages[p]
-        try:
-            page.merge_page(new_page_pdf_reader.pages[p])
-        except IndexError:
-            # no annotations were added, skip merge
-            pass
-        page_map[p] = page
-
-    # add all pages including merged page(s) to output pdf
-    output = PdfWriter()
-    for i, looped_page in enumerate(original_writer.pages):
-        if merged_page := page_map.get(i):
-            output.add_page(merged_page)
+    # group annotations by page in a single pass
+    annotations_by_page: dict[int, list[tuple[float, float, str]]] = {}
+    for (x, y, page_number), annotation_text in data_dict.items():
+        if annotation_text is None:
             continue
-        output.add_page(looped_page)
-    output.set_need_appearances_writer()
+        annotations_by_page.setdefault(page_number, []).append((x, y, annotation_text))
+
+    if engine == "native":
+        for page_number, annotations in annotations_by_page.items():
+            add_text_overlay(original_writer, page_number, annotations, font_name, font_size, font_rgb)
+    elif annotations_by_page:
+        from pdf_form.reportlab_overlay import add_reportlab_overlay
+
+        add_reportlab_overlay(original_writer, annotations_by_page, page_size, font_name, font_size, font_rgb)
 
-    return output
+    original_writer.set_need_appearances_writer()
 
 
 def pdf_reader_to_writer(pdf_reader: PdfReader) -> PdfWriter:
     """Adds pages from a PdfReader object to a PdfWriter object."""
-    pdf_writer = PdfWriter()
-    pdf_writer.clone_document_from_reader(pdf_reader)
+    with stage("clone"):
+        pdf_writer = PdfWriter()
+        pdf_writer.clone_document_from_reader(pdf_reader)
     return pdf_writer
 
 
@@ -114,9 +101,20 @@ def is_text_field(annotation):
         return True
 
 
-def annotation_iter(writer):
-    """Generator that returns only viable PDF annotations from PdfWriter object, and their /T key value (or 'key')"""
-    for page_number, page in enumerate(writer.pages):
+def annotation_iter(pdf):
+    """
+    Generator that returns only viable PDF annotations from a PdfReader or PdfWriter object, their /T key value
+    (or 'key') and page number. Only /Annots, widget dictionaries and /Parent entries are resolved, so iterating a
+    PdfReader directly never loads page content streams or images.
+    """
+    metrics = current_metrics()
+    if metrics is None:
+        return _widget_annotations(pdf)
+    return timed_annotations(_widget_annotations(pdf), metrics)
+
+
+def _widget_annotations(pdf):
+    for page_number, page in enumerate(pdf.pages):
         logger.debug("PAGE: " + str(page_number))
         annotations = page.get(PdfDictKeys.ANNOTATION_KEY)
         if not annotations:
@@ -141,11 +139,37 @@ def annotation_iter(writer):
             yield annot, key, page_number
 
 
+def qualified_field_name(annot):
+    """Returns the fully qualified name of a widget's field, e.g. ``topmostSubform[0].Page1[0].Name[0]``"""
+    names = []
+    node = annot
+    seen = set()
+    while node is not None and id(node) not in seen:
+        seen.add(id(node))
+        name = node.get(PdfDictKeys.FIELD_KEY)
+        if name is not None:
+            names.append(name)
+        parent = node.get(PdfDictKeys.PARENT_KEY)
+        node = parent.get_object() if parent is not None else None
+    return ".".join(reversed(names))
+
+
 def field_iter(writer, fields):
+    """
+    Generator of the annotations whose field name is a key of ``fields``, in document order.
+    Keys may be either the partial name (``/T``) used by ``annotation_iter`` or the fully qualified name.
+    """
+    if not fields:
+        return
+    # only walk /Parent chains when a key could be a fully qualified name
+    match_qualified = any(isinstance(field, str) and "." in field for field in fields)
     for annot, key, page_number in annotation_iter(writer):
-        for field in fields.keys():
-            if key == field:
-                yield annot, field, page_number
+        if key in fields:
+            yield annot, key, page_number
+        elif match_qualified:
+            qualified_key = qualified_field_name(annot)
+            if qualified_key in fields:
+                yield annot, qualified_key, page_number
 
 
 def _set_read_only(annot, read_only=False):
@@ -153,6 +177,11 @@ def _set_read_only(annot, read_only=False):
         annot.update({NameObject("/Ff"): NumberObject(1)})
 
 
+# characters urllib.parse.quote_plus leaves as they are
+_PDF_NAME_SAFE_CHARACTERS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~")
+
+
+@functools.lru_cache(maxsize=4096)
 def _pdf_encode(value: str):
     """
     PDF encoding uses url encoding but instead of "%", "#" is used, and spaces are not escaped/encoded.
@@ -163,33 +192,53 @@ def _pdf_encode(value: str):
         return
     if value.startswith("/"):
         value = value[1:]
-    value = urllib.parse.quote_plus(value)
-    value = re.sub(r"\+", "#20", value)
-    value = re.sub(r"%[a-zA-Z0-9]{2}", lambda match: f"#{match.group(0)[1:]}", value)
+    if _PDF_NAME_SAFE_CHARACTERS.issuperset(value):
+        return f"/{value}"
+    # after quote_plus, "+" only stands for a space and "%" only starts an escape
+    value = urllib.parse.quote_plus(value).replace("+", "#20").replace("%", "#")
     return f"/{value}"
 
 
-def _update_checkbox_value(annot, value, read_only=False):
+def checkbox_states(annot):
+    """Returns the appearance state names (e.g. ``/Yes``, ``/Off``) of a checkbox/radio widget"""
+    return list(annot[PdfDictKeys.CHECKBOX_VALUES_KEY][PdfDictKeys.POSITIVE_VALUES_KEY].keys())
+
+
+def checkbox_state_map(states):
+    """
+    Map of the values that select each appearance state of a checkbox/radio widget to the state name.
+    A state such as ``/Option 1`` is selected by ``Option 1``, by its PDF encoded form ``Option#201``, and by
+    either of those with a leading slash.
+    """
+    state_map = {}
+    for state in states:
+        decoded = state[1:]
+        if not decoded:
+            continue
+        state_map.setdefault(decoded, state)
+        state_map.setdefault(_pdf_encode(decoded)[1:], state)
+    return state_map
+
+
+def _update_checkbox_value(annot, value, read_only=False, state_map=None):
     """
     Standardise and fill PDF checkboxes by field name
     """
     if value is None:
         return
 
+    if state_map is None:
+        state_map = checkbox_state_map(checkbox_states(annot))
+
     # ascertain positive checkbox value from annotation dict
-    positive_value = list(
-        filter(
-            lambda x: _pdf_encode(value) == x,
-            annot[PdfDictKeys.CHECKBOX_VALUES_KEY][PdfDictKeys.POSITIVE_VALUES_KEY].keys(),
-        )
-    )
-    value = positive_value[0] if len(positive_value) else PdfDictKeys.NEGATIVE_VALUE
+    key = value[1:] if value.startswith("/") else value
+    value = state_map.get(key, PdfDictKeys.NEGATIVE_VALUE.value)
 
     # update annotation object
     annot.update(
         {
-            NameObject(PdfDictKeys.TEXT_VALUE_KEY): NameObject(value),
-            NameObject(PdfDictKeys.CHECKBOX_VALUE_KEY): NameObject(value),
+            NameObject(PdfDictKeys.TEXT_VALUE_KEY.value): NameObject(value),
+            NameObject(PdfDictKeys.CHECKBOX_VALUE_KEY.value): NameObject(value),
         }
     )
 
@@ -207,27 +256,71 @@ def _update_form_field(annot, value, read_only=False):
     _set_read_only(annot, read_only)
 
 
-def update_pdf_form_fields_from_dict(writer, data, read_only=False):
-    """Update PDF AcroForm fields from a data dict"""
-    for annot, field, _ in field_iter(writer, data):
-        value = data[field]
+def field_type(annot):
+    """Returns the field type the filling functions treat this annotation as (``/Tx``, ``/Btn`` or None)"""
+    if is_text_field(annot):
+        return PdfDictKeys.TEXT_FIELD_TYPE.value
+    if is_checkbox(annot):
+        return PdfDictKeys.CHECKBOX_FIELD_TYPE.value
+    return None
 
-        # if value is None, just set read_only flag
-        if value is None:
-            _set_read_only(annot, read_only)
-            continue
 
-        # check if we need to remove this annotation from the PDF
-        elif value == Markers.REMOVE:
-            annot.pop("/Rect", None)
-            # hacky but works, with no /Rect key the annotation won't appear
-            continue
+def _fill_annotation(annot, value, read_only=False, ft=None, state_map=None):
+    """
+    Apply a single data value to a widget annotation.
+    ``ft`` and ``state_map`` (see ``checkbox_state_map``) may be passed in when already known, to skip detecting
+    them from the annotation.
+    """
+    # if value is None, just set read_only flag
+    if value is None:
+        _set_read_only(annot, read_only)
+        return
 
-        # fill text fields and checkboxes respectively
-        if is_text_field(annot):
-            _update_form_field(annot, value, read_only)
-        elif is_checkbox(annot):
-            _update_checkbox_value(annot, value, read_only)
+    # check if we need to remove this annotation from the PDF
+    elif value == Markers.REMOVE:
+        annot.pop("/Rect", None)
+        # hacky but works, with no /Rect key the annotation won't appear
+        return
+
+    if ft is None:
+        ft = field_type(annot)
+
+    # fill text fields and checkboxes respectively
+    if ft == PdfDictKeys.TEXT_FIELD_TYPE:
+        _update_form_field(annot, value, read_only)
+    elif ft == PdfDictKeys.CHECKBOX_FIELD_TYPE:
+        _update_checkbox_value(annot, value, read_only, state_map)
+
+
+def update_pdf_form_fields_from_dict(writer, data, read_only=False, schema=None):
+    """
+    Update PDF AcroForm fields from a data dict, in a PdfWriter or directly in a PdfReader's objects.
+    If the form's cached ``FormSchema`` is given, field types are taken from it instead of detected per annotation.
+    Returns the annotations that were updated (e.g. for ``write_pdf_incremental``).
+    """
+    field_types = schema.field_types if schema is not None else {}
+    updated = []
+    with stage("update_fields"):
+        for annot, field, _ in field_iter(writer, data):
+            _fill_annotation(annot, data[field], read_only, field_types.get(field))
+            updated.append(annot)
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.fields_updated += len(updated)
+    return updated
+
+
+def set_need_appearances(pdf):
+    """
+    Set /NeedAppearances in the AcroForm of a PdfReader or PdfWriter, so viewers regenerate field appearances.
+    Returns the indirect object that was modified (the AcroForm, or the catalog if the AcroForm is a direct object).
+    """
+    root = pdf.trailer["/Root"] if isinstance(pdf, PdfReader) else pdf.root_object
+    acro_form = root.get("/AcroForm")
+    if acro_form is None:
+        acro_form = root[NameObject("/AcroForm")] = DictionaryObject()
+    acro_form.get_object()[NameObject("/NeedAppearances")] = BooleanObject(True)
+    return acro_form.get_object() if isinstance(acro_form, IndirectObject) else root
 
 
 def create_manual_dict(writer, data):
@@ -242,20 +335,23 @@ def create_manual_dict(writer, data):
     return data_by_coords
 
 
-def extract_field_names(pdf_file: Union[str, BytesIO, Path]):
+def extract_field_names(pdf_file: Union[str, BytesIO, Path, PdfReader]):
     """
     For PDF analysis for both mapping of PDFs and on-the-fly filling of unmapped PDF AcroForms.
     Returns a list of field names (keys) used in given PDF file
     """
     fields = []
-    reader = load_pdf(pdf_file)
-    for _, key in annotation_iter(pdf_reader_to_writer(reader)):
+    if not isinstance(pdf_file, PdfReader):
+        reader = load_pdf(pdf_file)
+    else:
+        reader = pdf_file
+    for _, key, _ in annotation_iter(reader):
         fields.append(key)
     return fields
 
 
 def extract_checkbox_values(
-    pdf_file: Union[str, BytesIO, Path]
+    pdf_file: Union[str, BytesIO, Path, PdfReader]
 ) -> dict[str, list[str]]:
     """
     For analysis of PDF files for the purposes of mapping widget values to checkbox values.
@@ -265,9 +361,9 @@ def extract_checkbox_values(
         reader = load_pdf(pdf_file)
     else:
         reader = pdf_file
-    for annot, key, _ in annotation_iter(pdf_reader_to_writer(reader)):
+    for annot, key, _ in annotation_iter(reader):
         if is_checkbox(annot):
-            values = list(annot[PdfDictKeys.CHECKBOX_VALUES_KEY][PdfDictKeys.POSITIVE_VALUES_KEY].keys())
+            values = checkbox_states(annot)
             try:
                 key = annot[PdfDictKeys.FIELD_KEY]
             except KeyError:
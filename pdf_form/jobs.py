@@ -0,0 +1,170 @@
+"""
+Resumable, sharded batch jobs: records are filled into an output directory, and every completed record is logged to
+an append-only JSONL manifest with the SHA-256 checksum of its PDF.
+
+A job can be split into ``shard_count`` shards, run independently (by separate processes or machines sharing the
+output directory), each logging to its own ``manifest.shard-<i>-of-<n>.jsonl``. Rerunning a job or shard skips every
+record already in one of the directory's manifests; ``merge_manifests`` combines them into ``manifest.jsonl``.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from pdf_form.batch import Record, _ordered_results, get_worker_template, record_filename
+from pdf_form.file_operations import write_bytes_atomic
+
+MANIFEST_NAME = "manifest.jsonl"
+_MANIFEST_PATTERN = "manifest*.jsonl"
+
+
+@dataclass
+class JobSummary:
+    filled: int = 0
+    # records already in a manifest
+    skipped: int = 0
+    # records belonging to other shards
+    other_shards: int = 0
+
+
+def shard_of(record_id: Any, shard_count: int) -> int:
+    """The shard of a record: stable across processes, machines and Python versions (unlike ``hash``)"""
+    digest = hashlib.sha256(str(record_id).encode()).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def shard_manifest_path(output_dir: Union[str, Path], shard: int = 0, shard_count: int = 1) -> Path:
+    if shard_count == 1:
+        return Path(output_dir) / MANIFEST_NAME
+    return Path(output_dir) / f"manifest.shard-{shard}-of-{shard_count}.jsonl"
+
+
+def read_manifest(path: Union[str, Path]) -> Iterator[dict]:
+    """
+    The entries of a manifest: ``{"id", "path", "sha256", "bytes"}``, ``path`` relative to the output directory.
+    A truncated last line, left by a run that was killed while writing it, is ignored.
+    """
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "id" in entry:
+                yield entry
+
+
+def completed_ids(output_dir: Union[str, Path]) -> set[str]:
+    """Ids (as strings) of the records in any manifest of ``output_dir``"""
+    done: set[str] = set()
+    for path in Path(output_dir).glob(_MANIFEST_PATTERN):
+        done.update(str(entry["id"]) for entry in read_manifest(path))
+    return done
+
+
+def _open_manifest(path: Path):
+    """Open a manifest for appending, ending the truncated line a killed run may have left so it stays on its own"""
+    manifest = open(path, "ab+")
+    if manifest.tell():
+        manifest.seek(-1, os.SEEK_END)
+        if manifest.read(1) != b"\n":
+            manifest.write(b"\n")
+    return manifest
+
+
+def _fill_record_file(template_path, record_id, data, read_only, output_dir) -> dict:
+    name = record_filename(record_id)
+    pdf_bytes = get_worker_template(template_path).fill(data, read_only=read_only)
+    write_bytes_atomic(Path(output_dir) / name, pdf_bytes)
+    return {"id": record_id, "path": name, "sha256": hashlib.sha256(pdf_bytes).hexdigest(), "bytes": len(pdf_bytes)}
+
+
+def run_job(
+    template_path: Union[str, Path],
+    records: Iterable[Record],
+    output_dir: Union[str, Path],
+    shard: int = 0,
+    shard_count: int = 1,
+    workers: Optional[int] = None,
+    read_only: bool = False,
+    max_in_flight: Optional[int] = None,
+) -> JobSummary:
+    """
+    Fill the records of one shard of a job into ``<output_dir>/<record_id>.pdf``, skipping the records already
+    completed (ids that aren't a valid file name fail with a ValueError, see ``record_filename``). Each PDF is
+    written atomically, then logged to the shard's manifest, so a job killed at any point can be rerun with the same
+    arguments to finish it.
+    :param records: ``(record_id, data)`` pairs (e.g. from ``read_records``), the same for every shard
+    :param shard: index of the shard to run, from 0 to ``shard_count - 1``
+    :param shard_count: number of shards the job is split into
+    (other parameters as in ``fill_batch``)
+    """
+    if not 0 <= shard < shard_count:
+        raise ValueError(f"Shard {shard} is not in 0..{shard_count - 1}")
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    done = completed_ids(output_dir)
+    summary = JobSummary()
+
+    def pending():
+        for record_id, data in records:
+            if shard_count > 1 and shard_of(record_id, shard_count) != shard:
+                summary.other_shards += 1
+            elif str(record_id) in done:
+                summary.skipped += 1
+            else:
+                done.add(str(record_id))
+                yield template_path, record_id, data, read_only, output_dir
+
+    executor = ProcessPoolExecutor(workers, initializer=get_worker_template, initargs=(template_path,))
+    with executor, _open_manifest(shard_manifest_path(output_dir, shard, shard_count)) as manifest:
+        for entry in _ordered_results(executor, _fill_record_file, pending(), max_in_flight):
+            manifest.write(json.dumps(entry).encode() + b"\n")
+            # flushed per record, so a killed job loses no completed records
+            manifest.flush()
+            summary.filled += 1
+        os.fsync(manifest.fileno())
+    return summary
+
+
+def merge_manifests(output_dir: Union[str, Path]) -> int:
+    """
+    Combine the shard manifests of ``output_dir`` into its ``manifest.jsonl`` (written atomically) and return the
+    number of records in it. Shard manifests are kept, so shards can still be resumed and merged again.
+    """
+    output_dir = Path(output_dir)
+    merged = output_dir / MANIFEST_NAME
+    entries: dict[str, dict] = {}
+    for path in sorted(output_dir.glob(_MANIFEST_PATTERN)):
+        for entry in read_manifest(path):
+            entries[str(entry["id"])] = entry
+    write_bytes_atomic(merged, "".join(json.dumps(entry) + "\n" for entry in entries.values()).encode())
+    return len(entries)
+
+
+def verify_outputs(output_dir: Union[str, Path]) -> list[Any]:
+    """
+    Ids of the records of ``output_dir``'s manifests whose PDF is missing or doesn't match its checksum, or whose
+    manifest ``path`` isn't the record's own file name in ``output_dir``
+    """
+    output_dir = Path(output_dir)
+    entries: dict[str, dict] = {}
+    for path in output_dir.glob(_MANIFEST_PATTERN):
+        entries.update((str(entry["id"]), entry) for entry in read_manifest(path))
+    failed = []
+    for entry in entries.values():
+        try:
+            valid = entry.get("path") == record_filename(entry["id"])
+        except ValueError:
+            valid = False
+        pdf_path = output_dir / entry["path"] if valid else None
+        if pdf_path is None or not pdf_path.is_file():
+            failed.append(entry["id"])
+        elif hashlib.sha256(pdf_path.read_bytes()).hexdigest() != entry["sha256"]:
+            failed.append(entry["id"])
+    return failed
@@ -0,0 +1,201 @@
+"""
+Fill many records into one combined document that shares the form's resources between the copies.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterable, Optional, Union, cast
+
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, NameObject, TextStringObject
+
+from pdf_form.constants import PdfDictKeys
+from pdf_form.file_operations import load_pdf
+from pdf_form.form_filling import (
+    _fill_annotation,
+    checkbox_state_map,
+    checkbox_states,
+    field_type,
+    pdf_reader_to_writer,
+    qualified_field_name,
+    set_need_appearances,
+)
+from pdf_form.metrics import stage
+
+# page attributes a page can inherit from the page tree
+_INHERITABLE_PAGE_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+@dataclass(frozen=True)
+class _Annotation:
+    """An annotation of a template page, as it was before any record was filled."""
+    original: DictionaryObject
+    snapshot: dict
+    # partial and fully qualified field name of widgets, empty for other annotations
+    names: tuple[str, ...] = ()
+    field_type: Optional[str] = None
+    state_map: Optional[dict] = None
+
+
+class _MergedForm:
+    def __init__(self, writer: PdfWriter, field_prefix: str, read_only: bool):
+        self.writer = writer
+        self.field_prefix = field_prefix
+        self.read_only = read_only
+        self.pages: list[tuple[dict, list[_Annotation]]] = []
+        # original field dictionaries (widgets and their ancestors) by id, before any record was filled
+        self.field_snapshots: dict[int, dict] = {}
+        for page in writer.pages:
+            annotations = []
+            for ref in page.get(PdfDictKeys.ANNOTATION_KEY.value, None) or []:
+                annot = ref.get_object()
+                annotations.append(self._index_annotation(annot))
+            self.pages.append((self._page_snapshot(page), annotations))
+
+        acro_form = writer.root_object.get("/AcroForm")
+        if acro_form is None:
+            acro_form = writer.root_object[NameObject("/AcroForm")] = DictionaryObject()
+        acro_form = cast(DictionaryObject, acro_form.get_object())
+        # the field hierarchy changes, so XFA field bindings would no longer match
+        acro_form.pop("/XFA", None)
+        self.top_level_fields = list(acro_form.get("/Fields", []))
+        self.record_roots = acro_form[NameObject("/Fields")] = ArrayObject()
+
+    @staticmethod
+    def _page_snapshot(page) -> dict:
+        snapshot = {key: value for key, value in page.items() if key not in ("/Annots", "/Parent")}
+        node = page
+        while node.get("/Parent") is not None:
+            node = node["/Parent"].get_object()
+            for key in _INHERITABLE_PAGE_KEYS:
+                if key not in snapshot and key in node:
+                    snapshot[key] = node.raw_get(key)
+        return snapshot
+
+    def _index_annotation(self, annot) -> _Annotation:
+        if annot.get(PdfDictKeys.SUBTYPE_KEY) != PdfDictKeys.WIDGET_SUBTYPE:
+            return _Annotation(annot, dict(annot))
+        node = annot
+        while node is not None and id(node) not in self.field_snapshots:
+            self.field_snapshots[id(node)] = dict(node)
+            parent = node.get(PdfDictKeys.PARENT_KEY.value)
+            node = parent.get_object() if parent is not None else None
+        key = annot.get(PdfDictKeys.FIELD_KEY)
+        if key is None and annot.get(PdfDictKeys.PARENT_KEY) is not None:
+            key = annot[PdfDictKeys.PARENT_KEY].get(PdfDictKeys.FIELD_KEY)
+        ft = field_type(annot)
+        states = checkbox_states(annot) if ft == PdfDictKeys.CHECKBOX_FIELD_TYPE else ()
+        return _Annotation(
+            annot,
+            self.field_snapshots[id(annot)],
+            tuple(name for name in (key, qualified_field_name(annot)) if name is not None),
+            ft,
+            checkbox_state_map(states),
+        )
+
+    def _record_root(self, index: int):
+        root = self.writer._add_object(
+            DictionaryObject(
+                {
+                    NameObject(PdfDictKeys.FIELD_KEY.value): TextStringObject(f"{self.field_prefix}{index}"),
+                    NameObject("/Kids"): ArrayObject(),
+                }
+            )
+        )
+        self.record_roots.append(root)
+        return root
+
+    def _fill(self, annotation: _Annotation, annot, data: dict):
+        for name in annotation.names:
+            if name in data:
+                _fill_annotation(annot, data[name], self.read_only, annotation.field_type, annotation.state_map)
+                return
+
+    def add_first_record(self, data: dict):
+        """The first record is filled into the template's own pages and fields"""
+        root = self._record_root(0)
+        root_dict = root.get_object()
+        for field in self.top_level_fields:
+            field.get_object()[NameObject(PdfDictKeys.PARENT_KEY.value)] = root
+            root_dict["/Kids"].append(field)
+        for _, annotations in self.pages:
+            for annotation in annotations:
+                if annotation.names:
+                    self._fill(annotation, annotation.original, data)
+
+    def _copy_field(self, original, copies: dict, root):
+        """Returns the reference of this record's copy of a field dictionary, copying its ancestors as needed"""
+        copy_ref = copies.get(id(original))
+        if copy_ref is not None:
+            return copy_ref
+        copy = DictionaryObject(self.field_snapshots[id(original)])
+        copy.pop("/Kids", None)
+        copy_ref = copies[id(original)] = self.writer._add_object(copy)
+        parent = self.field_snapshots[id(original)].get(PdfDictKeys.PARENT_KEY.value)
+        parent_ref = root if parent is None else self._copy_field(parent.get_object(), copies, root)
+        copy[NameObject(PdfDictKeys.PARENT_KEY.value)] = parent_ref
+        parent_dict = parent_ref.get_object()
+        if "/Kids" not in parent_dict:
+            parent_dict[NameObject("/Kids")] = ArrayObject()
+        parent_dict["/Kids"].append(copy_ref)
+        return copy_ref
+
+    def add_record(self, index: int, data: dict):
+        """Later records get new page and widget dictionaries, pointing to the template's shared objects"""
+        root = self._record_root(index)
+        copies: dict = {}
+        for page_snapshot, annotations in self.pages:
+            page = PageObject(self.writer)
+            page.update(page_snapshot)
+            page = self.writer.add_page(page)
+            annots = ArrayObject()
+            for annotation in annotations:
+                if annotation.names:
+                    annot_ref = self._copy_field(annotation.original, copies, root)
+                    annot = annot_ref.get_object()
+                    self._fill(annotation, annot, data)
+                else:
+                    annot = DictionaryObject(annotation.snapshot)
+                    annot_ref = self.writer._add_object(annot)
+                if "/P" in annot:
+                    annot[NameObject("/P")] = page.indirect_reference
+                annots.append(annot_ref)
+            if annots:
+                page[NameObject(PdfDictKeys.ANNOTATION_KEY.value)] = annots
+
+
+def fill_merged(
+    pdf: Union[str, Path, IO[bytes], PdfReader],
+    records: Iterable[dict],
+    read_only: bool = False,
+    field_prefix: str = "r",
+) -> PdfWriter:
+    """
+    Fill a form once per record into a single document, e.g. for printing or archiving many filled copies.
+
+    Pages, content streams, fonts, images and appearance streams of the form are shared by all the copies; each
+    record only adds its page dictionaries, widget annotations and field values. Each record's fields are moved under
+    a root field named ``<field_prefix><index>`` (``r0``, ``r1``...), so field names stay unique: ``Name`` of the
+    third record becomes ``r2.Name``. Record data uses the form's own field names, as in
+    ``update_pdf_form_fields_from_dict``.
+    :param pdf: the form
+    :param records: data dicts, one per copy, consumed lazily
+    :param read_only: set filled fields read only
+    :param field_prefix: prefix of the per-record root field names
+    :return: a PdfWriter holding every filled copy, in record order
+    :raises ValueError: if there are no records
+    """
+    reader = pdf if isinstance(pdf, PdfReader) else load_pdf(pdf)
+    writer = pdf_reader_to_writer(reader)
+    with stage("update_fields"):
+        merged = _MergedForm(writer, field_prefix, read_only)
+        count = 0
+        for index, data in enumerate(records):
+            if index == 0:
+                merged.add_first_record(data)
+            else:
+                merged.add_record(index, data)
+            count += 1
+    if not count:
+        raise ValueError("No records to fill")
+    set_need_appearances(writer)
+    return writer
@@ -0,0 +1,207 @@
+"""
+Optional timing metrics for form fills.
+
+Nothing is recorded unless metrics are being collected, either for a block of code with :func:`collect_metrics`
+or for every ``FormTemplate.fill`` through a hook set with :func:`set_metrics_hook`. When neither is active, each
+instrumented stage costs a single context variable lookup.
+
+Stages recorded (in seconds): ``load`` (``load_pdf``), ``clone`` (copying a PdfReader into a PdfWriter),
+``annotation_iter`` (walking the widget annotations), ``update_fields`` (applying values, including the
+``annotation_iter`` time of that walk), ``manual_annotations`` and ``write``.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+MetricsCallback = Callable[["FillMetrics"], None]
+
+
+@dataclass
+class FillMetrics:
+    """What one fill (or a block of fills collected together) did, and how long each stage took."""
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    annotations_visited: int = 0
+    fields_updated: int = 0
+    output_bytes: int = 0
+    total_seconds: float = 0.0
+
+    def add_stage(self, stage: str, seconds: float):
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def add(self, other: "FillMetrics"):
+        """Add the stage times and counts of ``other`` to these"""
+        for stage, seconds in other.stage_seconds.items():
+            self.add_stage(stage, seconds)
+        self.annotations_visited += other.annotations_visited
+        self.fields_updated += other.fields_updated
+        self.output_bytes += other.output_bytes
+        self.total_seconds += other.total_seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "stage_seconds": dict(self.stage_seconds),
+            "annotations_visited": self.annotations_visited,
+            "fields_updated": self.fields_updated,
+            "output_bytes": self.output_bytes,
+            "total_seconds": self.total_seconds,
+        }
+
+
+_current: contextvars.ContextVar[Optional[FillMetrics]] = contextvars.ContextVar("pdf_form_metrics", default=None)
+_hook: Optional[MetricsCallback] = None
+_DISABLED = nullcontext()
+
+
+def current_metrics() -> Optional[FillMetrics]:
+    """The metrics being collected in this context, or None when collection is off"""
+    return _current.get()
+
+
+@contextmanager
+def collect_metrics(callback: Optional[MetricsCallback] = None) -> Iterator[FillMetrics]:
+    """
+    Record the metrics of everything run inside the ``with`` block (in this thread or asyncio task).
+    When collections are nested, the inner one is also added to the outer one.
+    :param callback: called with the metrics when the block exits
+    """
+    metrics = FillMetrics()
+    outer = _current.get()
+    token = _current.set(metrics)
+    start = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.total_seconds = time.perf_counter() - start
+        _current.reset(token)
+        if outer is not None:
+            outer.add(metrics)
+        if callback is not None:
+            callback(metrics)
+
+
+def set_metrics_hook(callback: Optional[MetricsCallback]):
+    """
+    Have ``callback`` called with the metrics of every ``FormTemplate.fill`` in this process, on whichever thread
+    ran the fill (e.g. a ``MetricsRecorder``). Pass None to turn it off again.
+    """
+    global _hook
+    _hook = callback
+
+
+def fill_scope():
+    """Context manager around one whole fill, reporting it to the metrics hook if there is one"""
+    if _hook is None:
+        return _DISABLED
+    return collect_metrics(_hook)
+
+
+class _Stage:
+    __slots__ = ("_metrics", "_stage", "_start")
+
+    def __init__(self, metrics: FillMetrics, stage: str):
+        self._metrics = metrics
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *_):
+        self._metrics.add_stage(self._stage, time.perf_counter() - self._start)
+
+
+def stage(name: str):
+    """Context manager timing a stage of the fill, if metrics are being collected"""
+    metrics = _current.get()
+    if metrics is None:
+        return _DISABLED
+    return _Stage(metrics, name)
+
+
+def timed_annotations(annotations: Iterable[T], metrics: FillMetrics) -> Iterator[T]:
+    """Pass ``annotations`` through, recording the time spent producing them and how many there were"""
+    iterator = iter(annotations)
+    count = 0
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                annotation = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += time.perf_counter() - start
+            count += 1
+            yield annotation
+    finally:
+        metrics.add_stage("annotation_iter", elapsed)
+        metrics.annotations_visited += count
+
+
+# upper bounds of the fill duration histogram, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRecorder:
+    """
+    Metrics hook/callback aggregating fills, e.g. ``set_metrics_hook(recorder)``, for export as a dict or in the
+    Prometheus text format. Keeps the slowest fill seen, to help find pathologically expensive forms.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.fills = 0
+        self.totals = FillMetrics()
+        self.slowest: Optional[FillMetrics] = None
+        self._bucket_counts = [0] * len(self.buckets)
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics: FillMetrics):
+        with self._lock:
+            self.fills += 1
+            self.totals.add(metrics)
+            if self.slowest is None or metrics.total_seconds > self.slowest.total_seconds:
+                self.slowest = metrics
+            for i, bound in enumerate(self.buckets):
+                if metrics.total_seconds <= bound:
+                    self._bucket_counts[i] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "fills": self.fills,
+                **self.totals.as_dict(),
+                "slowest": self.slowest.as_dict() if self.slowest is not None else None,
+            }
+
+    def to_prometheus(self, prefix: str = "pdf_form") -> str:
+        """The aggregated metrics as counters and a fill duration histogram, in the Prometheus text format"""
+        with self._lock:
+            lines = [
+                f"# TYPE {prefix}_stage_seconds_total counter",
+                *(
+                    f'{prefix}_stage_seconds_total{{stage="{stage_name}"}} {seconds!r}'
+                    for stage_name, seconds in sorted(self.totals.stage_seconds.items())
+                ),
+            ]
+            for name, value in (
+                ("annotations_visited", self.totals.annotations_visited),
+                ("fields_updated", self.totals.fields_updated),
+                ("output_bytes", self.totals.output_bytes),
+            ):
+                lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+            lines.append(f"# TYPE {prefix}_fill_seconds histogram")
+            for bound, count in zip(self.buckets, self._bucket_counts):
+                lines.append(f'{prefix}_fill_seconds_bucket{{le="{bound!r}"}} {count}')
+            lines += [
+                f'{prefix}_fill_seconds_bucket{{le="+Inf"}} {self.fills}',
+                f"{prefix}_fill_seconds_sum {self.totals.total_seconds!r}",
+                f"{prefix}_fill_seconds_count {self.fills}",
+            ]
+            return "\n".join(lines) + "\n"
@@ -0,0 +1,168 @@
+"""
+Coordinate-based text overlays written straight into page content streams, without a reportlab round trip.
+"""
+import weakref
+from typing import Iterable, Union
+
+from pypdf import PdfWriter
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, IndirectObject, NameObject
+
+
+int_or_float = Union[int, float]
+
+# the standard 14 fonts, which every PDF viewer provides without embedding
+STANDARD_FONTS = frozenset(
+    {
+        "Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique",
+        "Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique",
+        "Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic",
+        "Symbol", "ZapfDingbats",
+    }
+)
+
+OVERLAY_FONT_PREFIX = "/PdfForm"
+
+# objects added once per writer and shared by every page: fonts by name, and the "q" stream opening each overlay
+_shared_objects: "weakref.WeakKeyDictionary[PdfWriter, dict[str, IndirectObject]]" = weakref.WeakKeyDictionary()
+# resource dictionaries (and their /Font, /XObject... entries) copied for a single page, by id
+_page_local: "weakref.WeakValueDictionary[int, DictionaryObject]" = weakref.WeakValueDictionary()
+
+
+def _shared_object(writer: PdfWriter, key: str, factory) -> IndirectObject:
+    objects = _shared_objects.setdefault(writer, {})
+    if key not in objects:
+        objects[key] = writer._add_object(factory())
+    return objects[key]
+
+
+def _stream(data: bytes) -> DecodedStreamObject:
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    return stream
+
+
+def font_reference(writer: PdfWriter, font_name: str) -> IndirectObject:
+    """Returns the writer's shared font dictionary for one of the standard 14 fonts, adding it on first use"""
+    if font_name not in STANDARD_FONTS:
+        raise ValueError(f"{font_name} is not one of the standard 14 PDF fonts")
+
+    def factory():
+        font = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject(f"/{font_name}"),
+            }
+        )
+        if font_name not in ("Symbol", "ZapfDingbats"):
+            font[NameObject("/Encoding")] = NameObject("/WinAnsiEncoding")
+        return font
+
+    return _shared_object(writer, f"font:{font_name}", factory)
+
+
+def pdf_literal_string(text: str) -> bytes:
+    """Encodes text as a PDF literal string for a WinAnsiEncoding font (unsupported characters become ``?``)"""
+    encoded = text.encode("cp1252", errors="replace")
+    return b"(" + encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").replace(b"\r", b"\\r") + b")"
+
+
+def _number(value: int_or_float) -> str:
+    return f"{float(value):.4f}".rstrip("0").rstrip(".")
+
+
+def text_operators(
+    annotations: Iterable[tuple[float, float, str]],
+    font_resource: str,
+    font_size: int_or_float,
+    font_rgb: tuple[int_or_float, int_or_float, int_or_float],
+) -> bytes:
+    """
+    Content stream operators drawing each ``(x, y, text)`` with its baseline starting at ``(x, y)``.
+    Multi-line text is laid out the same way as ``manual_add_annotations`` lays it out with reportlab.
+    """
+    operators = [f"BT {font_resource} {_number(font_size)} Tf {' '.join(map(_number, font_rgb))} rg".encode()]
+    for x, y, annotation_text in annotations:
+        for i, line in enumerate(reversed(annotation_text.split("\n"))):
+            y = y + font_size * i
+            operators.append(
+                f"1 0 0 1 {_number(x)} {_number(y)} Tm ".encode() + pdf_literal_string(line) + b" Tj"
+            )
+    operators.append(b"ET")
+    return b"\n".join(operators)
+
+
+def _page_local_copy(dictionary) -> DictionaryObject:
+    copy = DictionaryObject(dictionary.get_object()) if dictionary is not None else DictionaryObject()
+    _page_local[id(copy)] = copy
+    return copy
+
+
+def _is_page_local(dictionary) -> bool:
+    return dictionary is not None and _page_local.get(id(dictionary.get_object())) is dictionary.get_object()
+
+
+def _page_resources(page) -> DictionaryObject:
+    """
+    The page's /Resources, copied for this page only the first time it is added to: resource dictionaries are often
+    shared between pages (or inherited from the page tree), and a name added for one page must not change another's
+    """
+    resources = page.get("/Resources")
+    if _is_page_local(resources):
+        return resources.get_object()
+    parent = page.get("/Parent")
+    while parent is not None and resources is None:
+        parent = parent.get_object()
+        resources = parent.get("/Resources")
+        parent = parent.get("/Parent")
+    resources = page[NameObject("/Resources")] = _page_local_copy(resources)
+    return resources
+
+
+def add_text_overlay(
+    writer: PdfWriter,
+    page_number: int,
+    annotations: Iterable[tuple[float, float, str]],
+    font_name: str,
+    font_size: int_or_float,
+    font_rgb: tuple[int_or_float, int_or_float, int_or_float],
+):
+    """
+    Append text drawn at the given coordinates to a page's /Contents (see ``append_page_content``).
+    """
+    page = writer.pages[page_number]
+    font_resource = add_font_resource(writer, page, font_name)
+    append_page_content(writer, page, text_operators(annotations, font_resource, font_size, font_rgb))
+
+
+def add_page_resource(page, category: str, name: str, reference: IndirectObject):
+    """Add a named resource (e.g. category ``/Font`` or ``/XObject``) to a page's /Resources"""
+    resources = _page_resources(page)
+    entries = resources.get(category)
+    if entries is None or not _is_page_local(entries):
+        entries = resources[NameObject(category)] = _page_local_copy(entries)
+    entries[NameObject(name)] = reference
+
+
+def add_font_resource(writer: PdfWriter, page, font_name: str) -> str:
+    """Add one of the standard 14 fonts to a page's resources, returning its resource name"""
+    font_resource = f"{OVERLAY_FONT_PREFIX}{font_name.replace('-', '')}"
+    add_page_resource(page, "/Font", font_resource, font_reference(writer, font_name))
+    return font_resource
+
+
+def append_page_content(writer: PdfWriter, page, operators: bytes):
+    """
+    Append content stream operators (Flate compressed) to a page's /Contents.
+    The existing content is wrapped in ``q``/``Q`` so its graphics state can't affect what is appended.
+    """
+    appended = writer._add_object(_stream(b"Q\n" + operators).flate_encode())
+    save_state = _shared_object(writer, "q", lambda: _stream(b"q\n"))
+    contents = page.get("/Contents")
+    if contents is None:
+        existing = []
+    elif isinstance(contents.get_object(), ArrayObject):
+        existing = list(contents.get_object())
+    else:
+        existing = [contents]
+    page[NameObject("/Contents")] = ArrayObject([save_state, *existing, appended])
@@ -0,0 +1,47 @@
+"""
+Text overlays drawn with reportlab and merged into the pages.
+
+Kept apart from ``form_filling`` so reportlab is only imported the first time the ``reportlab`` engine of
+``manual_add_annotations`` is used.
+"""
+import io
+from typing import Union
+
+from pypdf import PdfReader, PdfWriter
+from reportlab.pdfgen import canvas  # type: ignore
+
+int_or_float = Union[int, float]
+
+
+def add_reportlab_overlay(
+    writer: PdfWriter,
+    annotations_by_page: dict[int, list[tuple[float, float, str]]],
+    page_size: tuple[float, float],
+    font_name: str,
+    font_size: int_or_float,
+    font_rgb: tuple[int_or_float, int_or_float, int_or_float],
+) -> None:
+    """
+    Draw every overlay page on a single reportlab canvas, parse it once and merge each overlay page into its page
+    of ``writer`` in place.
+    :param annotations_by_page: ``(x, y, text)`` annotations by page index, ``\\n`` starts a new line upwards
+    """
+    page_numbers = sorted(annotations_by_page)
+    packet = io.BytesIO()
+    overlay = canvas.Canvas(packet, pagesize=page_size)
+    for page_number in page_numbers:
+        overlay.setFont(font_name, font_size)
+        overlay.setFillColorRGB(*font_rgb)
+        new_line_offset = font_size
+        for x, y, annotation_text in annotations_by_page[page_number]:
+            annotation_lines = annotation_text.split("\n")
+            for i, line in enumerate(reversed(annotation_lines)):
+                y = y + new_line_offset * i
+                overlay.drawString(x, y, line)
+        overlay.showPage()
+    overlay.save()
+    packet.seek(0)
+
+    # overlay page i holds the annotations of page_numbers[i]
+    for page_number, overlay_page in zip(page_numbers, PdfReader(packet).pages):
+        writer.pages[page_number].merge_page(overlay_page)
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
+from functools import cached_property
+from io import BytesIO
+from pathlib import Path
+from typing import IO, Optional, Union
+
+from pypdf import PdfReader
+
+from pdf_form.constants import PdfDictKeys
+from pdf_form.file_operations import load_pdf
+from pdf_form.form_filling import annotation_iter, checkbox_states, field_type, qualified_field_name
+
+
+PdfSource = Union[str, Path, IO[bytes], bytes]
+
+
+@dataclass(frozen=True)
+class FieldSchema:
+    """A single form widget: its field names, type, position and checkbox appearance states."""
+    name: str
+    qualified_name: str
+    field_type: Optional[str]
+    page_number: int
+    rect: Optional[tuple[float, float, float, float]]
+    states: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class FormSchema:
+    """The widgets of a form, in document order (the order ``annotation_iter`` yields them)."""
+    fields: tuple[FieldSchema, ...]
+
+    @property
+    def field_names(self) -> list[str]:
+        return [field.name for field in self.fields]
+
+    @cached_property
+    def field_types(self) -> dict[str, Optional[str]]:
+        """
+        Field types by qualified name, and by partial name where that names a single field: partial names shared
+        by fields under different parents are left out, so fills by those names detect each widget's type
+        """
+        types: dict[str, Optional[str]] = {}
+        partial: dict[str, FieldSchema] = {}
+        ambiguous = set()
+        for field in self.fields:
+            types[field.qualified_name] = field.field_type
+            first = partial.setdefault(field.name, field)
+            if first.qualified_name != field.qualified_name:
+                ambiguous.add(field.name)
+        for name, field in partial.items():
+            if name not in ambiguous:
+                types[name] = field.field_type
+        return types
+
+    @property
+    def checkbox_values(self) -> dict[str, list[str]]:
+        """Same as ``extract_checkbox_values``, without opening the PDF"""
+        values: dict[str, list[str]] = {}
+        for field in self.fields:
+            if field.field_type == PdfDictKeys.CHECKBOX_FIELD_TYPE:
+                values.setdefault(field.name, []).extend(field.states)
+        return values
+
+    def to_json(self) -> str:
+        return json.dumps([astuple(field) for field in self.fields], separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data: Union[str, bytes]) -> "FormSchema":
+        return cls(
+            tuple(
+                FieldSchema(name, qualified_name, ft, page, tuple(rect) if rect else None, tuple(states))
+                for name, qualified_name, ft, page, rect, states in json.loads(data)
+            )
+        )
+
+
+def _rect(rect) -> Optional[tuple[float, float, float, float]]:
+    if not rect:
+        return None
+    x0, y0, x1, y1 = (float(r) for r in rect)
+    return x0, y0, x1, y1
+
+
+def extract_form_schema(pdf: Union[PdfSource, PdfReader]) -> FormSchema:
+    """Walk the widgets of a PDF once and return their schema"""
+    if isinstance(pdf, bytes):
+        pdf = BytesIO(pdf)
+    reader = pdf if isinstance(pdf, PdfReader) else load_pdf(pdf)
+    fields = []
+    for annot, key, page_number in annotation_iter(reader):
+        if key is None:
+            continue
+        ft = field_type(annot)
+        rect = annot.get("/Rect")
+        fields.append(
+            FieldSchema(
+                name=key,
+                qualified_name=qualified_field_name(annot),
+                field_type=ft,
+                page_number=page_number,
+                rect=_rect(rect),
+                states=tuple(checkbox_states(annot)) if ft == PdfDictKeys.CHECKBOX_FIELD_TYPE else (),
+            )
+        )
+    return FormSchema(tuple(fields))
+
+
+def pdf_content_key(pdf_bytes: bytes) -> str:
+    """Cache key of a PDF: a hash of its bytes"""
+    return hashlib.blake2b(pdf_bytes, digest_size=20).hexdigest()
+
+
+def _file_id(path: Union[str, Path]) -> tuple:
+    """Identifies a file's current contents without reading it: replaced or modified files get a new id"""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _read_bytes(pdf: PdfSource) -> bytes:
+    if isinstance(pdf, bytes):
+        return pdf
+    if isinstance(pdf, (str, Path)):
+        with open(pdf, "rb") as f:
+            return f.read()
+    pdf.seek(0)
+    return pdf.read()
+
+
+class SchemaCache:
+    """
+    Persistent LRU cache of form schemas in a SQLite file, keyed by ``pdf_content_key``.
+
+    At most ``max_entries`` schemas are kept on disk; the least recently used are evicted first. The most recently
+    used ``memory_entries`` schemas are also kept in memory, so repeated lookups don't touch the database, and the
+    keys of files looked up by path are remembered by their size and modification time, so they aren't read again.
+    """
+
+    def __init__(self, path: Union[str, Path], max_entries: int = 10_000, memory_entries: int = 128):
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[str, FormSchema] = OrderedDict()
+        # _file_id of a path -> its pdf_content_key
+        self._file_keys: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS schemas (key TEXT PRIMARY KEY, schema TEXT NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS schemas_last_used ON schemas (last_used)")
+        self._db.commit()
+        # logical clock for LRU order, so entries used in the same instant still have a distinct order
+        self._clock = self._db.execute("SELECT COALESCE(MAX(last_used), 0) FROM schemas").fetchone()[0]
+        # last_used of memory hits, written to the database in batches (before evicting, and on close)
+        self._touched: dict[str, int] = {}
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._write_touched()
+            self._db.commit()
+        self._db.close()
+
+    def _write_touched(self):
+        if self._touched:
+            self._db.executemany(
+                "UPDATE schemas SET last_used = ? WHERE key = ?", [(tick, key) for key, tick in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM schemas").fetchone()[0]
+
+    def _remember(self, key: str, schema: FormSchema):
+        self._memory[key] = schema
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[FormSchema]:
+        with self._lock:
+            schema = self._memory.get(key)
+            if schema is not None:
+                self._memory.move_to_end(key)
+                self._touched[key] = self._tick()
+                return schema
+            row = self._db.execute("SELECT schema FROM schemas WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE schemas SET last_used = ? WHERE key = ?", (self._tick(), key))
+            self._db.commit()
+            schema = FormSchema.from_json(row[0])
+            self._remember(key, schema)
+            return schema
+
+    def put(self, key: str, schema: FormSchema):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO schemas (key, schema, last_used) VALUES (?, ?, ?)",
+                (key, schema.to_json(), self._tick()),
+            )
+            self._touched.pop(key, None)
+            self._write_touched()
+            self._db.execute(
+                "DELETE FROM schemas WHERE key IN "
+                "(SELECT key FROM schemas ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+            self._remember(key, schema)
+
+    def get_or_extract(self, pdf: PdfSource) -> FormSchema:
+        """Returns the cached schema of a PDF, extracting and storing it on first sight"""
+        path = pdf if isinstance(pdf, (str, Path)) else None
+        file_id = _file_id(path) if path is not None else None
+        key = self._file_keys.get(file_id) if file_id is not None else None
+        if key is not None:
+            schema = self.get(key)
+            if schema is not None:
+                return schema
+        pdf_bytes = _read_bytes(pdf)
+        key = pdf_content_key(pdf_bytes)
+        # only remember the key if the file didn't change while it was read
+        if path is not None and file_id is not None and _file_id(path) == file_id:
+            with self._lock:
+                self._file_keys[file_id] = key
+                self._file_keys.move_to_end(file_id)
+                while len(self._file_keys) > self.max_entries:
+                    self._file_keys.popitem(last=False)
+        schema = self.get(key)
+        if schema is None:
+            schema = extract_form_schema(pdf_bytes)
+            self.put(key, schema)
+        return schema
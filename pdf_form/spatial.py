@@ -0,0 +1,174 @@
+"""
+Spatial index of form widgets, to relate ``(x, y, page)`` coordinates to fields.
+"""
+import math
+import statistics
+from array import array
+from pathlib import Path
+from typing import IO, Iterator, Optional, Union
+
+from pypdf import PdfReader
+
+from pdf_form.schema import FieldSchema, FormSchema, extract_form_schema
+
+MIN_CELL_SIZE = 8.0
+
+
+class WidgetIndex:
+    """
+    Uniform grid per page over the widget rects of a form, built once from its ``FormSchema``.
+
+    Rects are kept in flat arrays (one column per coordinate) and every grid cell lists the widgets overlapping it,
+    so point and box queries only look at the widgets of the few cells they touch.
+    Coordinates are PDF user space coordinates, as used by ``create_manual_dict``/``manual_add_annotations``.
+    """
+
+    def __init__(self, schema: FormSchema, cell_size: Optional[float] = None):
+        """
+        :param schema: the form's schema (see ``extract_form_schema``); widgets without a /Rect aren't indexed
+        :param cell_size: grid cell size in points, defaults to the median of the widgets' smaller side (their height,
+            for text fields), so cells stay about as small as the widgets they hold
+        """
+        self.fields: list[FieldSchema] = []
+        self.x0, self.y0, self.x1, self.y1 = array("d"), array("d"), array("d"), array("d")
+        self._names: dict[str, list[int]] = {}
+        for field in schema.fields:
+            if field.rect is None:
+                continue
+            x0, y0, x1, y1 = field.rect
+            self.x0.append(min(x0, x1))
+            self.y0.append(min(y0, y1))
+            self.x1.append(max(x0, x1))
+            self.y1.append(max(y0, y1))
+            index = len(self.fields)
+            self.fields.append(field)
+            self._names.setdefault(field.name, []).append(index)
+            if field.qualified_name != field.name:
+                self._names.setdefault(field.qualified_name, []).append(index)
+
+        if cell_size is None:
+            sizes = [min(self.x1[i] - self.x0[i], self.y1[i] - self.y0[i]) for i in range(len(self.fields))]
+            cell_size = statistics.median(sizes) if sizes else MIN_CELL_SIZE
+        self.cell_size = max(float(cell_size), MIN_CELL_SIZE)
+
+        # page -> (column, row) -> widget indices, and the page's occupied (column, row) bounds
+        self._grids: dict[int, dict[tuple[int, int], list[int]]] = {}
+        self._bounds: dict[int, tuple[int, int, int, int]] = {}
+        for index, field in enumerate(self.fields):
+            grid = self._grids.setdefault(field.page_number, {})
+            columns, rows = self._cells(self.x0[index], self.y0[index], self.x1[index], self.y1[index])
+            for column in columns:
+                for row in rows:
+                    grid.setdefault((column, row), []).append(index)
+            bounds = self._bounds.get(field.page_number)
+            self._bounds[field.page_number] = (
+                (columns[0], rows[0], columns[-1], rows[-1])
+                if bounds is None
+                else (
+                    min(bounds[0], columns[0]), min(bounds[1], rows[0]),
+                    max(bounds[2], columns[-1]), max(bounds[3], rows[-1]),
+                )
+            )
+
+    @classmethod
+    def from_pdf(cls, pdf: Union[str, Path, IO[bytes], bytes, PdfReader], cell_size: Optional[float] = None):
+        return cls(extract_form_schema(pdf), cell_size)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def _cell(self, value: float) -> int:
+        return math.floor(value / self.cell_size)
+
+    def _cells(self, x0: float, y0: float, x1: float, y1: float) -> tuple[range, range]:
+        return range(self._cell(x0), self._cell(x1) + 1), range(self._cell(y0), self._cell(y1) + 1)
+
+    def _distance(self, index: int, x: float, y: float) -> float:
+        dx = max(self.x0[index] - x, 0.0, x - self.x1[index])
+        dy = max(self.y0[index] - y, 0.0, y - self.y1[index])
+        return math.hypot(dx, dy)
+
+    def containing(self, x: float, y: float, page_number: int) -> list[FieldSchema]:
+        """The widgets whose rect contains the point (edges included)"""
+        candidates = self._grids.get(page_number, {}).get((self._cell(x), self._cell(y)), ())
+        return [
+            self.fields[i] for i in candidates
+            if self.x0[i] <= x <= self.x1[i] and self.y0[i] <= y <= self.y1[i]
+        ]
+
+    def overlapping(self, x0: float, y0: float, x1: float, y1: float, page_number: int) -> list[FieldSchema]:
+        """The widgets whose rect overlaps the box, in document order"""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        grid = self._grids.get(page_number)
+        if not grid:
+            return []
+        # only the page's occupied cells can hold widgets, however large the box
+        min_column, min_row, max_column, max_row = self._bounds[page_number]
+        columns, rows = self._cells(x0, y0, x1, y1)
+        columns = range(max(columns.start, min_column), min(columns.stop, max_column + 1))
+        rows = range(max(rows.start, min_row), min(rows.stop, max_row + 1))
+        found = set()
+        for column in columns:
+            for row in rows:
+                for i in grid.get((column, row), ()):
+                    if self.x0[i] <= x1 and x0 <= self.x1[i] and self.y0[i] <= y1 and y0 <= self.y1[i]:
+                        found.add(i)
+        return [self.fields[i] for i in sorted(found)]
+
+    @staticmethod
+    def _ring(column: int, row: int, radius: int, bounds: tuple[int, int, int, int]) -> Iterator[tuple[int, int]]:
+        """The cells at Chebyshev distance ``radius`` from ``(column, row)``, within ``bounds``"""
+        min_column, min_row, max_column, max_row = bounds
+        if radius == 0:
+            yield column, row
+            return
+        columns = range(max(column - radius, min_column), min(column + radius, max_column) + 1)
+        for r in (row - radius, row + radius):
+            if min_row <= r <= max_row:
+                for c in columns:
+                    yield c, r
+        rows = range(max(row - radius + 1, min_row), min(row + radius - 1, max_row) + 1)
+        for c in (column - radius, column + radius):
+            if min_column <= c <= max_column:
+                for r in rows:
+                    yield c, r
+
+    def nearest(
+        self, x: float, y: float, page_number: int, max_distance: Optional[float] = None
+    ) -> Optional[tuple[FieldSchema, float]]:
+        """
+        The widget closest to the point (distance 0 if a rect contains it) and its distance, or None if the page has
+        no widgets within ``max_distance``.
+        """
+        grid = self._grids.get(page_number)
+        if not grid:
+            return None
+        bounds = min_column, min_row, max_column, max_row = self._bounds[page_number]
+        column, row = self._cell(x), self._cell(y)
+        # rings closer than the page's occupied cells are empty, rings beyond them are outside
+        first_radius = max(min_column - column, column - max_column, min_row - row, row - max_row, 0)
+        last_radius = max(column - min_column, max_column - column, row - min_row, max_row - row, 0)
+        best: Optional[tuple[float, int]] = None
+        for radius in range(first_radius, last_radius + 1):
+            for cell in self._ring(column, row, radius, bounds):
+                for i in grid.get(cell, ()):
+                    candidate = (self._distance(i, x, y), i)
+                    if best is None or candidate < best:
+                        best = candidate
+            # any widget not seen yet is at least ``radius`` whole cells away
+            reached = radius * self.cell_size
+            if best is not None and best[0] <= reached:
+                break
+            if max_distance is not None and reached > max_distance:
+                break
+        if best is None or (max_distance is not None and best[0] > max_distance):
+            return None
+        return self.fields[best[1]], best[0]
+
+    def locate(self, name: str) -> list[tuple[int, tuple[float, float, float, float]]]:
+        """Where a field sits: ``(page_number, (x0, y0, x1, y1))`` of each of its widgets, by partial or qualified name"""
+        return [
+            (self.fields[i].page_number, (self.x0[i], self.y0[i], self.x1[i], self.y1[i]))
+            for i in self._names.get(name, ())
+        ]
@@ -0,0 +1,100 @@
+import threading
+from dataclasses import dataclass, field as dataclass_field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Optional, Union
+
+from pypdf import PdfReader
+from pypdf.generic import DictionaryObject
+
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes
+from pdf_form.form_filling import (
+    _fill_annotation,
+    annotation_iter,
+    checkbox_state_map,
+    checkbox_states,
+    field_type,
+    pdf_reader_to_writer,
+    qualified_field_name,
+)
+from pdf_form.constants import PdfDictKeys
+from pdf_form.metrics import current_metrics, fill_scope, stage
+
+if TYPE_CHECKING:
+    from pdf_form.schema import FormSchema
+
+
+@dataclass(frozen=True)
+class TemplateField:
+    """A single widget of a template field, located once when the template is compiled."""
+    page_number: int
+    annotation: DictionaryObject
+    field_type: Optional[str]
+    # decoded checkbox/radio value -> appearance state name, see ``checkbox_state_map``
+    state_map: dict[str, str] = dataclass_field(default_factory=dict)
+
+
+class FormTemplate:
+    """
+    A PDF form parsed and indexed once, to be filled many times.
+
+    The document is loaded and cloned into a PdfWriter a single time, and every widget is mapped by both its
+    partial and fully qualified field name.
+    Each call to :meth:`fill` applies only the values it is given to the shared document, writes it out, and then
+    restores the touched annotations, so the document is never re-parsed or re-walked between fills.
+    """
+
+    def __init__(self, pdf: Union[str, Path, IO[bytes], PdfReader], schema: Optional["FormSchema"] = None):
+        """
+        :param pdf: the form to compile
+        :param schema: the form's cached ``FormSchema``; field types and checkbox states are then taken from it
+            instead of being detected from each annotation
+        """
+        reader = pdf if isinstance(pdf, PdfReader) else load_pdf(pdf)
+        self._writer = pdf_reader_to_writer(reader)
+        self._lock = threading.Lock()
+        self.fields: dict[str, list[TemplateField]] = {}
+        self._qualified_fields: dict[str, list[TemplateField]] = {}
+        widgets = [widget for widget in annotation_iter(self._writer) if widget[1] is not None]
+        if schema is not None and len(schema.fields) != len(widgets):
+            raise ValueError("schema does not match the form's widgets")
+        for index, (annot, key, page_number) in enumerate(widgets):
+            if schema is not None:
+                ft, states = schema.fields[index].field_type, schema.fields[index].states
+            else:
+                ft = field_type(annot)
+                states = tuple(checkbox_states(annot)) if ft == PdfDictKeys.CHECKBOX_FIELD_TYPE else ()
+            field = TemplateField(page_number, annot, ft, checkbox_state_map(states))
+            self.fields.setdefault(key, []).append(field)
+            self._qualified_fields.setdefault(qualified_field_name(annot), []).append(field)
+
+    @property
+    def field_names(self) -> list[str]:
+        return list(self.fields.keys())
+
+    def get_field(self, name: str) -> list[TemplateField]:
+        """Returns the widgets of a field by partial or fully qualified name (empty if there is no such field)"""
+        return self.fields.get(name) or self._qualified_fields.get(name, [])
+
+    def fill(self, data: dict, read_only: bool = False) -> bytes:
+        """
+        Returns the bytes of the template filled with ``data`` (same semantics as ``update_pdf_form_fields_from_dict``).
+        Each call is reported to the metrics hook, if one is set (see ``pdf_form.metrics``).
+        """
+        with self._lock, fill_scope():
+            originals: dict[int, tuple[DictionaryObject, dict]] = {}
+            try:
+                with stage("update_fields"):
+                    for name, value in data.items():
+                        for field in self.get_field(name):
+                            annot = field.annotation
+                            if id(annot) not in originals:
+                                originals[id(annot)] = (annot, dict(annot))
+                            _fill_annotation(annot, value, read_only, field.field_type, field.state_map)
+                metrics = current_metrics()
+                if metrics is not None:
+                    metrics.fields_updated += len(originals)
+                return write_pdf_to_bytes(self._writer)
+            finally:
+                for annot, original in originals.values():
+                    annot.clear()
+                    annot.update(original)
@@ -0,0 +1,39 @@
+import asyncio
+import io
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_form.aio import AsyncFiller, afill
+from pdf_form.template import FormTemplate
+
+
+def _given_name(pdf_bytes):
+    return PdfReader(io.BytesIO(pdf_bytes)).get_fields()["Given Name Text Box"]["/V"]
+
+
+def test_afill(simple_form_path):
+    template = FormTemplate(simple_form_path)
+    pdf_bytes = asyncio.run(afill(template, {"Given Name Text Box": "Alice"}))
+    assert _given_name(pdf_bytes) == "Alice"
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_async_filler_concurrent_fills(simple_form_path, executor):
+    async def fill_all():
+        async with AsyncFiller(executor, max_workers=2, max_concurrency=2, templates=[simple_form_path]) as filler:
+            return await asyncio.gather(
+                *(filler.fill(simple_form_path, {"Given Name Text Box": f"Name {n}"}) for n in range(4))
+            )
+
+    results = asyncio.run(fill_all())
+    assert [_given_name(pdf_bytes) for pdf_bytes in results] == [f"Name {n}" for n in range(4)]
+
+
+def test_async_filler_timeout(complex_form_path):
+    async def fill():
+        async with AsyncFiller(max_workers=1) as filler:
+            await filler.fill(complex_form_path, {}, timeout=0.001)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(fill())
@@ -0,0 +1,47 @@
+import io
+import json
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_form.batch import fill_batch, read_records, record_filename
+
+
+def _given_name(pdf_bytes):
+    return PdfReader(io.BytesIO(pdf_bytes)).get_fields()["Given Name Text Box"]["/V"]
+
+
+def test_fill_batch_streams_results_in_order(simple_form_path):
+    records = ((n, {"Given Name Text Box": f"Name {n}"}) for n in range(6))
+    results = list(fill_batch(simple_form_path, records, workers=2, max_in_flight=2))
+    assert [record_id for record_id, _ in results] == list(range(6))
+    assert [_given_name(pdf_bytes) for _, pdf_bytes in results] == [f"Name {n}" for n in range(6)]
+
+
+def test_fill_batch_to_output_dir(simple_form_path, tmp_path):
+    records = [("a", {"Given Name Text Box": "A"}), ("b", {"Given Name Text Box": "B"})]
+    results = dict(fill_batch(simple_form_path, records, workers=1, output_dir=tmp_path / "out"))
+    assert results == {"a": tmp_path / "out" / "a.pdf", "b": tmp_path / "out" / "b.pdf"}
+    assert _given_name(results["b"].read_bytes()) == "B"
+
+
+@pytest.mark.parametrize("record_id", ["../escaped", "a/b", "a\\b", "", ".."])
+def test_fill_batch_rejects_unsafe_ids(simple_form_path, tmp_path, record_id):
+    with pytest.raises(ValueError):
+        list(fill_batch(simple_form_path, [(record_id, {})], workers=1, output_dir=tmp_path / "out"))
+    assert list(tmp_path.rglob("*.pdf")) == []
+
+
+def test_record_filename():
+    assert record_filename(7) == "7.pdf"
+    assert record_filename("x-1 copy") == "x-1 copy.pdf"
+
+
+def test_read_records(tmp_path):
+    csv_path = tmp_path / "records.csv"
+    csv_path.write_text("id,Given Name Text Box\nx1,Alice\nx2,Bob\n")
+    assert list(read_records(csv_path)) == [("x1", {"Given Name Text Box": "Alice"}), ("x2", {"Given Name Text Box": "Bob"})]
+
+    jsonl_path = tmp_path / "records.jsonl"
+    jsonl_path.write_text(json.dumps({"Given Name Text Box": "Alice"}) + "\n\n" + json.dumps({"id": 7}) + "\n")
+    assert list(read_records(jsonl_path)) == [(0, {"Given Name Text Box": "Alice"}), (7, {})]
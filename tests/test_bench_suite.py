@@ -0,0 +1,45 @@
+from benchmarks.startup import ImportTime, lazy_dependencies_imported, parse_importtime
+from benchmarks.suite import Benchmark, _time_benchmark, best_time, compare
+
+
+def _results(**medians):
+    return {"results": {name: {"median": median} for name, median in medians.items()}}
+
+
+def test_compare_flags_regressions_over_threshold():
+    baseline = _results(load=1.0, write=1.0, removed=1.0)
+    current = _results(load=1.05, write=1.5, added=9.0)
+    assert compare(baseline, current, threshold=0.1) == [("write", 1.0, 1.5)]
+    assert compare(baseline, current, threshold=0.6) == []
+
+
+def test_time_benchmark_runs_setup_untimed():
+    calls = []
+    benchmark = Benchmark("noop", lambda value: calls.append(value), setup=lambda: (len(calls),))
+    timing = _time_benchmark(benchmark, min_repeats=3, min_seconds=0)
+    assert timing["repeats"] == 3
+    assert calls == [0, 1, 2]
+    assert timing["min"] <= timing["median"]
+
+
+def test_best_time_runs_exactly_repeats():
+    calls = []
+    best = best_time(lambda value: calls.append(value), setup=lambda: (len(calls),), repeats=4)
+    assert calls == [0, 1, 2, 3]
+    assert best >= 0
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   zlib\n"
+        "import time:      3000 |       3500 |     reportlab.pdfgen\n"
+        "import time:       400 |       4020 | pdf_form.form_filling\n"
+    )
+    entries = parse_importtime(output)
+    assert entries == [
+        ImportTime("zlib", 120, 120),
+        ImportTime("reportlab.pdfgen", 3000, 3500),
+        ImportTime("pdf_form.form_filling", 400, 4020),
+    ]
+    assert lazy_dependencies_imported(entries) == {"reportlab"}
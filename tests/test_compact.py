@@ -0,0 +1,83 @@
+import io
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_form.compact import write_compact
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes, write_pdf_to_stream
+from pdf_form.form_filling import manual_add_annotations, pdf_reader_to_writer, update_pdf_form_fields_from_dict
+
+
+def _filled(path, data):
+    writer = pdf_reader_to_writer(load_pdf(path))
+    update_pdf_form_fields_from_dict(writer, data)
+    return writer
+
+
+def test_compact_round_trip(simple_form_path):
+    writer = _filled(simple_form_path, {"Given Name Text Box": "Alice (A)", "Driving License Check Box": "Yes"})
+    plain = write_pdf_to_bytes(writer)
+    compact = write_pdf_to_bytes(writer, compact=True)
+    assert len(compact) < len(plain)
+    assert compact.startswith(b"%PDF-1.")
+    reader = PdfReader(io.BytesIO(compact), strict=True)
+    fields = reader.get_fields()
+    assert fields["Given Name Text Box"]["/V"] == "Alice (A)"
+    assert fields["Driving License Check Box"]["/V"] == "/Yes"
+    assert len(reader.pages) == len(PdfReader(io.BytesIO(plain)).pages)
+    assert reader.trailer["/Root"]["/AcroForm"]["/Fields"]
+
+
+def test_compact_complex_form(complex_form_path):
+    writer = _filled(complex_form_path, {"First_Name_Given_Name[0]": "Bob"})
+    plain = write_pdf_to_bytes(writer)
+    compact = write_pdf_to_bytes(writer, compact=True)
+    assert len(compact) < len(plain)
+    reader = PdfReader(io.BytesIO(compact))
+    assert len(reader.pages) == 3
+    values = {name.rsplit(".", 1)[-1]: field.get("/V") for name, field in reader.get_fields().items()}
+    assert values["First_Name_Given_Name[0]"] == "Bob"
+
+
+def test_compact_deduplicates_manual_annotations(simple_form_path):
+    writer = pdf_reader_to_writer(load_pdf(simple_form_path))
+    manual_add_annotations(writer, {(100, 100 + 20 * i, 0): f"line {i}" for i in range(5)})
+    deduplicated, kept = io.BytesIO(), io.BytesIO()
+    write_compact(pdf_reader_to_writer(load_pdf(io.BytesIO(write_pdf_to_bytes(writer)))), kept, deduplicate=False)
+    write_compact(writer, deduplicated)
+    assert len(deduplicated.getvalue()) <= len(kept.getvalue())
+    text = PdfReader(deduplicated).pages[0].extract_text()
+    assert all(f"line {i}" in text for i in range(5))
+
+
+@pytest.mark.parametrize("level", [0, 1, 9])
+def test_compact_compression_levels(simple_form_path, level):
+    output = io.BytesIO()
+    size = write_compact(_filled(simple_form_path, {"Given Name Text Box": "Alice"}), output, compression_level=level)
+    assert size == len(output.getvalue())
+    assert PdfReader(output).get_fields()["Given Name Text Box"]["/V"] == "Alice"
+
+
+def test_compact_small_object_streams(simple_form_path):
+    output = io.BytesIO()
+    write_compact(_filled(simple_form_path, {"Given Name Text Box": "Alice"}), output, objects_per_stream=3)
+    assert PdfReader(output).get_fields()["Given Name Text Box"]["/V"] == "Alice"
+
+
+def test_compact_stream(simple_form_path):
+    writer = _filled(simple_form_path, {"Given Name Text Box": "Alice"})
+    output = io.BytesIO()
+    write_pdf_to_stream(writer, output, chunk_size=1024, compact=True)
+    assert output.getvalue() == write_pdf_to_bytes(writer, compact=True)
+
+
+def test_compact_encrypted_writer(simple_form_path):
+    writer = _filled(simple_form_path, {"Given Name Text Box": "Alice"})
+    writer.encrypt("secret")
+    output = io.BytesIO()
+    size = write_compact(writer, output)
+    assert size == len(output.getvalue())
+    reader = PdfReader(output)
+    assert reader.is_encrypted
+    reader.decrypt("secret")
+    assert reader.get_fields()["Given Name Text Box"]["/V"] == "Alice"
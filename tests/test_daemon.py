@@ -0,0 +1,117 @@
+import http.client
+import io
+import json
+import threading
+import urllib.request
+from contextlib import contextmanager
+
+import pytest
+from pypdf import PdfReader
+from pypdf.errors import PdfReadError
+
+from pdf_form.daemon import FillService, UnknownTemplateError, make_server
+from pdf_form.daemon_client import FillClient, FillServiceError
+
+
+def _given_name(pdf_bytes):
+    return PdfReader(io.BytesIO(pdf_bytes)).get_fields()["Given Name Text Box"]["/V"]
+
+
+@pytest.fixture
+def service(simple_form_path):
+    with FillService({"simple": simple_form_path}, executor="thread", max_workers=2) as service:
+        yield service
+
+
+@contextmanager
+def _serving(service, **kwargs):
+    server = make_server(service, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def server(request, service, tmp_path):
+    kwargs = {"socket_path": tmp_path / "fill.sock"} if request.param == "unix" else {"port": 0}
+    with _serving(service, **kwargs) as server:
+        yield server
+
+
+def test_service_fill(service):
+    assert _given_name(service.fill("simple", {"Given Name Text Box": "Alice"})) == "Alice"
+    with pytest.raises(UnknownTemplateError):
+        service.fill("missing", {})
+    stats = service.stats()
+    assert stats["requests"] == 2
+    assert stats["errors"] == 1
+    assert stats["fills_by_template"] == {"simple": 1}
+    assert stats["metrics"]["fills"] == 1
+    assert stats["metrics"]["output_bytes"] > 0
+
+
+def test_service_rejects_broken_template(tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    with pytest.raises(PdfReadError):
+        FillService({"broken": broken}, executor="thread")
+
+
+def test_client_fill(server):
+    with FillClient(server.address) as client:
+        assert client.health() == {"status": "ok", "templates": ["simple"], "workers": 2}
+        # several requests over the same kept-alive connection
+        for name in ("Alice", "Bob"):
+            assert _given_name(client.fill("simple", {"Given Name Text Box": name})) == name
+        read_only = PdfReader(io.BytesIO(client.fill("simple", {"Given Name Text Box": "Carol"}, read_only=True)))
+        assert read_only.get_fields()["Given Name Text Box"]["/Ff"] & 1
+        assert client.stats()["fills_by_template"] == {"simple": 3}
+
+
+def test_client_errors(server):
+    with FillClient(server.address) as client:
+        with pytest.raises(FillServiceError) as error:
+            client.fill("missing", {})
+        assert error.value.status == 404
+        # the connection is still usable after an error response
+        assert client.health()["status"] == "ok"
+
+
+def test_invalid_requests(service):
+    with _serving(service, port=0) as server:
+        for body, message in ((b"{", "Invalid JSON"), (b"[1]", "JSON object")):
+            request = urllib.request.Request(f"{server.address}/fill/simple", data=body, method="POST")
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(request)
+            assert error.value.code == 400
+            assert message in json.loads(error.value.read())["error"]
+        host, port = server.server_address[:2]
+        for length in (None, "abc", "-1"):
+            connection = http.client.HTTPConnection(host, port, timeout=5)
+            connection.putrequest("POST", "/fill/simple")
+            if length is not None:
+                connection.putheader("Content-Length", length)
+            connection.endheaders()
+            response = connection.getresponse()
+            assert response.status == 400
+            assert "Content-Length" in json.loads(response.read())["error"]
+            connection.close()
+
+
+def test_prometheus_stats(service):
+    service.fill("simple", {"Given Name Text Box": "Alice"})
+    with _serving(service, port=0) as server, urllib.request.urlopen(f"{server.address}/stats?format=prometheus") as r:
+        assert "pdf_form_fill_seconds_count 1" in r.read().decode()
+
+
+def test_process_workers(simple_form_path, tmp_path):
+    with FillService({"simple": simple_form_path}, executor="process", max_workers=2) as service:
+        with _serving(service, socket_path=tmp_path / "fill.sock") as server, FillClient(server.address) as client:
+            names = [_given_name(client.fill("simple", {"Given Name Text Box": f"N{i}"})) for i in range(3)]
+    assert names == ["N0", "N1", "N2"]
+    assert not (tmp_path / "fill.sock").exists()
@@ -1,10 +1,20 @@
+import io
 import os
+import re
 
 import pypdf.errors
 import pytest
 from pypdf import PdfReader, PdfWriter
 
-from pdf_form.file_operations import load_pdf, write_pdf_to_file, write_pdf_to_bytes
+from pdf_form.file_operations import (
+    iter_pdf_chunks,
+    load_pdf,
+    write_pdf_incremental_to_bytes,
+    write_pdf_to_bytes,
+    write_pdf_to_file,
+    write_pdf_to_stream,
+)
+from pdf_form.form_filling import set_need_appearances, update_pdf_form_fields_from_dict
 
 TEST_VALID_FILE = "test.pdf"
 TEST_FILE_NOT_FOUND = "_test.pdf"
@@ -48,6 +58,36 @@ def test_write_pdf_writer_to_file(test_data_path, valid_pdf_path, output_path):
     os.remove(output_path)
 
 
+def test_load_pdf_mmap(simple_form_path):
+    expected = load_pdf(simple_form_path).get_fields()
+    assert load_pdf(simple_form_path, use_mmap=True).get_fields() == expected
+    with open(simple_form_path, "rb") as f:
+        reader = load_pdf(f, use_mmap=True)
+    # the mapping outlives the file object
+    assert reader.get_fields() == expected
+
+
+def test_load_pdf_mmap_falls_back_to_reading(simple_form_path, tmp_path):
+    assert load_pdf(io.BytesIO(simple_form_path.read_bytes()), use_mmap=True).get_fields()
+    empty = tmp_path / "empty.pdf"
+    empty.write_bytes(b"")
+    for use_mmap in (False, True):
+        with pytest.raises(pypdf.errors.EmptyFileError):
+            load_pdf(empty, use_mmap=use_mmap)
+        with pytest.raises(FileNotFoundError):
+            load_pdf(tmp_path / "missing.pdf", use_mmap=use_mmap)
+
+
+def test_write_mmap_reader_to_stream(simple_form_path):
+    source = simple_form_path.read_bytes()
+    stream = io.BytesIO()
+    write_pdf_to_stream(load_pdf(simple_form_path, use_mmap=True), stream, chunk_size=1000)
+    assert stream.getvalue().startswith(source)
+    chunks = list(iter_pdf_chunks(load_pdf(simple_form_path, use_mmap=True), chunk_size=1000))
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert b"".join(chunks).startswith(source)
+
+
 def test_write_pdf_reader_to_bytes(valid_pdf_path):
     pdf = PdfReader(valid_pdf_path)
     pdf_b = write_pdf_to_bytes(pdf)
@@ -58,3 +98,100 @@ def test_write_pdf_writer_to_bytes(valid_pdf_path):
     pdf = PdfWriter(valid_pdf_path)
     pdf_b = write_pdf_to_bytes(pdf)
     assert isinstance(pdf_b, bytes)
+
+
+class _WriteOnlyStream:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+
+
+def test_write_pdf_writer_to_stream(simple_form_path):
+    pdf = PdfWriter(simple_form_path)
+    stream = _WriteOnlyStream()
+    write_pdf_to_stream(pdf, stream, chunk_size=4096)
+    assert len(stream.chunks) > 1
+    assert b"".join(stream.chunks) == write_pdf_to_bytes(pdf)
+
+
+def test_stream_writers_include_reader_changes(simple_form_path):
+    pdf = load_pdf(simple_form_path)
+    update_pdf_form_fields_from_dict(pdf, {"Given Name Text Box": "Alice", "Driving License Check Box": "Yes"})
+    stream = _WriteOnlyStream()
+    write_pdf_to_stream(pdf, stream)
+    streamed = b"".join(stream.chunks)
+    # written as the original bytes and an update, without cloning the reader
+    assert streamed.startswith(simple_form_path.read_bytes())
+    assert b"".join(iter_pdf_chunks(pdf)) == streamed
+    for output in (write_pdf_to_bytes(pdf), streamed):
+        fields = PdfReader(io.BytesIO(output), strict=True).get_fields()
+        assert fields["Given Name Text Box"]["/V"] == "Alice"
+        assert fields["Driving License Check Box"]["/V"] == "/Yes"
+
+
+def test_stream_encrypted_reader(simple_form_path):
+    writer = PdfWriter(simple_form_path)
+    writer.encrypt("secret")
+    pdf = load_pdf(io.BytesIO(write_pdf_to_bytes(writer)))
+    pdf.decrypt("secret")
+    update_pdf_form_fields_from_dict(pdf, {"Given Name Text Box": "Alice"})
+    stream = io.BytesIO()
+    write_pdf_to_stream(pdf, stream)
+    reader = PdfReader(stream)
+    reader.decrypt("secret")
+    assert reader.get_fields()["Given Name Text Box"]["/V"] == "Alice"
+
+
+def test_iter_pdf_chunks(simple_form_path):
+    pdf = PdfWriter(simple_form_path)
+    chunks = list(iter_pdf_chunks(pdf, chunk_size=4096))
+    assert all(len(chunk) >= 4096 for chunk in chunks[:-1])
+    assert b"".join(chunks) == write_pdf_to_bytes(pdf)
+
+
+def test_iter_pdf_chunks_stops_early(simple_form_path):
+    chunks = iter_pdf_chunks(PdfWriter(simple_form_path), chunk_size=1024, max_buffered=1)
+    assert next(chunks).startswith(b"%PDF")
+    chunks.close()
+
+
+@pytest.mark.parametrize(
+    "form, field, value",
+    [
+        ("simple-form.pdf", "Given Name Text Box", "Alice"),
+        ("i-9-paper-version.pdf", "topmostSubform[0].Page1[0].First_Name_Given_Name[0]", "Bob"),
+    ],
+)
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_write_pdf_incremental(test_data_path, form, field, value, use_mmap):
+    original = (test_data_path / form).read_bytes()
+    reader = load_pdf(test_data_path / form, use_mmap=use_mmap)
+    updated = update_pdf_form_fields_from_dict(reader, {field: value}, read_only=True)
+    updated.append(set_need_appearances(reader))
+    pdf_bytes = write_pdf_incremental_to_bytes(reader, updated)
+
+    assert pdf_bytes.startswith(original)
+    assert len(pdf_bytes) - len(original) < 10_000
+    filled = PdfReader(io.BytesIO(pdf_bytes))
+    assert filled.get_fields()[field]["/V"] == value
+    assert filled.get_fields()[field]["/Ff"] == 1
+    assert filled.trailer["/Root"]["/AcroForm"]["/NeedAppearances"]
+
+
+def test_write_pdf_incremental_xref_stream_has_own_entry(complex_form_path):
+    reader = load_pdf(complex_form_path)
+    updated = update_pdf_form_fields_from_dict(reader, {"First_Name_Given_Name[0]": "Bob"})
+    pdf_bytes = write_pdf_incremental_to_bytes(reader, updated)
+    xref_location = int(re.findall(rb"startxref\s+(\d+)", pdf_bytes)[-1])
+    idnum = int(re.match(rb"(\d+) 0 obj", pdf_bytes[xref_location:]).group(1))
+    filled = PdfReader(io.BytesIO(pdf_bytes))
+    filled.get_fields()
+    assert filled.xref[0][idnum] == xref_location
+    assert filled.trailer["/Size"] == idnum + 1
+
+
+def test_write_pdf_incremental_rejects_foreign_objects(valid_pdf_path, simple_form_path):
+    with pytest.raises(ValueError):
+        write_pdf_incremental_to_bytes(load_pdf(valid_pdf_path), [load_pdf(simple_form_path).pages[0]])
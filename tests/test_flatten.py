@@ -0,0 +1,114 @@
+import io
+import re
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DictionaryObject, NameObject
+
+from pdf_form.constants import Markers
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes
+from pdf_form.flatten import FLATTENED_XOBJECT_PREFIX, _text_style, flatten_form, text_field_operators
+from pdf_form.form_filling import pdf_reader_to_writer, update_pdf_form_fields_from_dict
+from pdf_form.merge import fill_merged
+from pdf_form.native_overlay import add_page_resource
+
+
+def _flattened(path, data):
+    writer = pdf_reader_to_writer(load_pdf(path))
+    update_pdf_form_fields_from_dict(writer, data)
+    return PdfReader(io.BytesIO(write_pdf_to_bytes(flatten_form(writer))))
+
+
+def test_flatten_simple_form(simple_form_path):
+    reader = _flattened(
+        simple_form_path, {"Given Name Text Box": "Alice (A)", "Driving License Check Box": "Yes"}
+    )
+    assert "/AcroForm" not in reader.trailer["/Root"]
+    assert reader.get_fields() is None
+    page = reader.pages[0]
+    assert "/Annots" not in page
+    assert "Alice (A)" in page.extract_text()
+    xobjects = page["/Resources"]["/XObject"]
+    assert any(name.startswith(FLATTENED_XOBJECT_PREFIX) for name in xobjects)
+
+
+def test_flatten_one_content_stream_per_page(simple_form_path):
+    original_contents = load_pdf(simple_form_path).pages[0]["/Contents"]
+    original_count = len(original_contents) if isinstance(original_contents, list) else 1
+    page = _flattened(simple_form_path, {"Given Name Text Box": "Alice", "Family Name Text Box": "Smith"}).pages[0]
+    # a shared "q" stream before the original content and one stream with every widget after it
+    assert len(page["/Contents"]) == original_count + 2
+
+
+def test_flatten_skips_removed_widgets(simple_form_path):
+    page = _flattened(simple_form_path, {"Given Name Text Box": Markers.REMOVE, "Family Name Text Box": "Smith"}).pages[0]
+    assert "Smith" in page.extract_text()
+
+
+def test_flatten_complex_form(complex_form_path):
+    reader = _flattened(complex_form_path, {"First_Name_Given_Name[0]": "Bobby", "MI[0]": "Q"})
+    assert "/AcroForm" not in reader.trailer["/Root"]
+    assert all("/Annots" not in page or all(
+        annot.get_object()["/Subtype"] != "/Widget" for annot in page["/Annots"]
+    ) for page in reader.pages)
+    assert "Bobby" in reader.pages[0].extract_text()
+
+
+def _drawn_xobjects(page):
+    """The objects the flattened content of a page draws, by idnum"""
+    names = re.findall(rb"(/PdfFormFlat\d+) Do", page["/Contents"][-1].get_object().get_data())
+    xobjects = page["/Resources"]["/XObject"]
+    return {xobjects.raw_get(name.decode()).idnum for name in names}
+
+
+def test_flatten_merged_records(simple_form_path):
+    writer = fill_merged(
+        simple_form_path, [{"Driving License Check Box": "Yes"}, {"Driving License Check Box": "Off"}]
+    )
+    checkbox = next(
+        annot.get_object() for annot in writer.pages[0]["/Annots"]
+        if annot.get_object().get("/T") == "Driving License Check Box"
+    )
+    states = checkbox["/AP"]["/N"]
+    checked, unchecked = states.raw_get("/Yes").idnum, states.raw_get("/Off").idnum
+    # every record's pages share the form's resources
+    flatten_form(writer)
+    first, second = (_drawn_xobjects(page) for page in writer.pages)
+    assert checked in first and unchecked not in first
+    assert unchecked in second and checked not in second
+
+
+def test_add_page_resource_shared_resources():
+    writer = PdfWriter()
+    pages = [writer.add_blank_page(100, 100) for _ in range(2)]
+    shared = writer._add_object(
+        DictionaryObject({NameObject("/XObject"): DictionaryObject({NameObject("/Original"): NameObject("/X")})})
+    )
+    for page in pages:
+        page[NameObject("/Resources")] = shared
+    references = [writer._add_object(DictionaryObject()) for _ in pages]
+    for page, reference in zip(pages, references):
+        add_page_resource(page, "/XObject", "/Added", reference)
+    assert [page["/Resources"]["/XObject"].raw_get("/Added") for page in pages] == references
+    assert all("/Original" in page["/Resources"]["/XObject"] for page in pages)
+    assert "/Added" not in shared.get_object()["/XObject"]
+
+
+@pytest.mark.parametrize(
+    "default_appearance, expected",
+    [
+        ("/Helv 10 Tf 0 0 0.75 rg", (10.0, (0.0, 0.0, 0.75))),
+        ("0 0 0 rg /F3 11 Tf", (11.0, (0.0, 0.0, 0.0))),
+        ("/Helv 0 Tf 0.5 g", (0.0, (0.5, 0.5, 0.5))),
+        ("", (0.0, (0.0, 0.0, 0.0))),
+    ],
+)
+def test_text_style(default_appearance, expected):
+    assert _text_style(default_appearance) == expected
+
+
+def test_text_field_operators_multiline():
+    operators = text_field_operators((0, 0, 100, 40), "one\ntwo", "/F", "/Helv 10 Tf 0 g", multiline=True)
+    assert b"0 0 100 40 re W n" in operators
+    assert b"1 0 0 1 2 28 Tm (one) Tj" in operators
+    assert b"1 0 0 1 2 18 Tm (two) Tj" in operators
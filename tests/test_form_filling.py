@@ -1,7 +1,20 @@
+import subprocess
+import sys
+
 import pytest
+from pypdf.generic import DictionaryObject, IndirectObject
 
 from pdf_form.file_operations import load_pdf
-from pdf_form.form_filling import extract_field_names, extract_checkbox_values
+from pdf_form.form_filling import (
+    _pdf_encode,
+    _update_checkbox_value,
+    checkbox_state_map,
+    extract_field_names,
+    extract_checkbox_values,
+    field_iter,
+    manual_add_annotations,
+    pdf_reader_to_writer,
+)
 
 
 @pytest.fixture
@@ -25,6 +38,19 @@ def test_extract_field_names_empty_pdf(valid_pdf_path):
     assert fields == []
 
 
+def test_extract_field_names(simple_form_path, simple_form_field_keys):
+    fields = extract_field_names(simple_form_path)
+    assert sorted(fields) == sorted(simple_form_field_keys)
+
+
+def test_extract_field_names_does_not_load_page_contents(complex_form_path):
+    reader = load_pdf(complex_form_path)
+    extract_field_names(reader)
+    contents = [page.raw_get("/Contents") for page in reader.pages]
+    assert all(isinstance(ref, IndirectObject) for ref in contents)
+    assert not any((ref.generation, ref.idnum) in reader.resolved_objects for ref in contents)
+
+
 def test_extract_checkbox_values_empty_pdf(complex_form_path, complex_pdf_checkbox_values_dict):
     values = extract_checkbox_values(complex_form_path)
     assert values == complex_pdf_checkbox_values_dict
@@ -40,3 +66,79 @@ def test_pdf_get_fields_complex_form(complex_form_path, complex_form_field_keys)
     pdf = load_pdf(complex_form_path)
     values = list(pdf.get_fields().keys())
     assert values == complex_form_field_keys
+
+
+def test_field_iter_partial_and_qualified_names(complex_form_path):
+    writer = pdf_reader_to_writer(load_pdf(complex_form_path))
+    data = {
+        "Middle_Initial[0]": "A",
+        "topmostSubform[0].Page1[0].U\\.S\\._Social_Security_Number__First_3_Numbers_[0]": "123",
+        "not_a_field": "x",
+    }
+    matched = [(field, page) for _, field, page in field_iter(writer, data)]
+    assert matched == [
+        ("Middle_Initial[0]", 0),
+        ("topmostSubform[0].Page1[0].U\\.S\\._Social_Security_Number__First_3_Numbers_[0]", 0),
+    ]
+    # keys that aren't strings never match, as before
+    assert [field for _, field, _ in field_iter(writer, {1: "x", "Middle_Initial[0]": "A"})] == ["Middle_Initial[0]"]
+
+
+@pytest.mark.parametrize("engine", ["reportlab", "native"])
+def test_manual_add_annotations_multi_page(complex_form_path, engine):
+    writer = pdf_reader_to_writer(load_pdf(complex_form_path))
+    output = manual_add_annotations(
+        writer, {(100, 700, 1): "OVERLAY TWO", (100, 700, 2): "OVERLAY THREE", (100, 680, 2): None}, engine=engine
+    )
+    assert output is writer
+    assert "OVERLAY" not in output.pages[0].extract_text()
+    assert "OVERLAY TWO" in output.pages[1].extract_text()
+    assert "OVERLAY THREE" in output.pages[2].extract_text()
+
+
+def test_manual_add_annotations_native_shares_font(complex_form_path):
+    writer = pdf_reader_to_writer(load_pdf(complex_form_path))
+    manual_add_annotations(writer, {(100, 700, 0): "first\nsecond (2)", (100, 700, 1): "third"}, engine="native")
+    fonts = [page["/Resources"]["/Font"].raw_get("/PdfFormHelvetica") for page in writer.pages[:2]]
+    assert fonts[0] == fonts[1]
+    text = writer.pages[0].extract_text()
+    assert "first" in text and "second (2)" in text
+
+
+@pytest.mark.parametrize(
+    "value, encoded",
+    [
+        ("Yes", "/Yes"),
+        ("/Yes", "/Yes"),
+        ("Option 1", "/Option#201"),
+        ("a/b (c)", "/a#2Fb#20#28c#29"),
+        ("100%+", "/100#25#2B"),
+        ("Café", "/Caf#C3#A9"),
+        ("", None),
+    ],
+)
+def test_pdf_encode(value, encoded):
+    assert _pdf_encode(value) == encoded
+
+
+def test_checkbox_state_map():
+    state_map = checkbox_state_map(["/Off", "/Yes", "/Option 1"])
+    assert state_map["Yes"] == "/Yes"
+    assert state_map["Option 1"] == "/Option 1"
+    assert state_map["Option#201"] == "/Option 1"
+
+
+@pytest.mark.parametrize("value, expected", [("Option 1", "/Option 1"), ("/Yes", "/Yes"), ("Maybe", "/Off")])
+def test_update_checkbox_value(value, expected):
+    annot = DictionaryObject()
+    _update_checkbox_value(annot, value, state_map=checkbox_state_map(["/Off", "/Yes", "/Option 1"]))
+    assert annot["/V"] == annot["/AS"] == expected
+
+
+def test_import_does_not_load_reportlab():
+    code = (
+        "import sys, logging, pdf_form.form_filling, pdf_form.template; "
+        "assert 'reportlab' not in sys.modules; "
+        "assert logging.getLogger('pdf_form.form_filling').level == logging.NOTSET"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_form.jobs import (
+    MANIFEST_NAME,
+    completed_ids,
+    merge_manifests,
+    read_manifest,
+    run_job,
+    shard_manifest_path,
+    shard_of,
+    verify_outputs,
+)
+
+
+def _records(count):
+    return [(f"rec{n}", {"Given Name Text Box": f"Name {n}"}) for n in range(count)]
+
+
+def test_shard_of_is_deterministic():
+    assert [shard_of(f"rec{n}", 4) for n in range(8)] == [shard_of(f"rec{n}", 4) for n in range(8)]
+    assert shard_of(7, 3) == shard_of("7", 3)
+    assert {shard_of(f"rec{n}", 4) for n in range(100)} == {0, 1, 2, 3}
+
+
+def test_run_job_writes_manifest(simple_form_path, tmp_path):
+    summary = run_job(simple_form_path, _records(3), tmp_path, workers=1)
+    assert (summary.filled, summary.skipped) == (3, 0)
+    entries = list(read_manifest(tmp_path / MANIFEST_NAME))
+    assert [entry["id"] for entry in entries] == ["rec0", "rec1", "rec2"]
+    reader = PdfReader(tmp_path / entries[1]["path"])
+    assert reader.get_fields()["Given Name Text Box"]["/V"] == "Name 1"
+    assert verify_outputs(tmp_path) == []
+    # no temporary files are left behind
+    assert sorted(path.name for path in tmp_path.iterdir()) == [MANIFEST_NAME, "rec0.pdf", "rec1.pdf", "rec2.pdf"]
+
+
+def test_run_job_resumes(simple_form_path, tmp_path):
+    run_job(simple_form_path, _records(2), tmp_path, workers=1)
+    # a run killed while logging a record leaves a truncated last line
+    with open(tmp_path / MANIFEST_NAME, "a") as f:
+        f.write('{"id": "rec2", "pa')
+    summary = run_job(simple_form_path, _records(4), tmp_path, workers=1)
+    assert (summary.filled, summary.skipped) == (2, 2)
+    assert completed_ids(tmp_path) == {"rec0", "rec1", "rec2", "rec3"}
+
+
+def test_sharded_job_and_merge(simple_form_path, tmp_path):
+    records = _records(10)
+    summaries = [run_job(simple_form_path, records, tmp_path, shard, 3, workers=1) for shard in range(3)]
+    assert sum(summary.filled for summary in summaries) == 10
+    assert all(summary.filled + summary.other_shards == 10 for summary in summaries)
+    for shard in range(3):
+        ids = [entry["id"] for entry in read_manifest(shard_manifest_path(tmp_path, shard, 3))]
+        assert all(shard_of(record_id, 3) == shard for record_id in ids)
+
+    assert merge_manifests(tmp_path) == 10
+    merged = [json.loads(line)["id"] for line in (tmp_path / MANIFEST_NAME).read_text().splitlines()]
+    assert sorted(merged) == sorted(record_id for record_id, _ in records)
+    # merging again, or rerunning a shard, changes nothing
+    assert merge_manifests(tmp_path) == 10
+    assert run_job(simple_form_path, records, tmp_path, 1, 3, workers=1).filled == 0
+
+
+def test_verify_outputs_detects_corruption(simple_form_path, tmp_path):
+    run_job(simple_form_path, _records(2), tmp_path, workers=1)
+    (tmp_path / "rec1.pdf").write_bytes(b"corrupt")
+    assert verify_outputs(tmp_path) == ["rec1"]
+
+
+def test_run_job_rejects_unsafe_ids(simple_form_path, tmp_path):
+    with pytest.raises(ValueError):
+        run_job(simple_form_path, [("../escaped", {})], tmp_path / "out", workers=1)
+    assert list(tmp_path.rglob("*.pdf")) == []
+
+
+def test_verify_outputs_rejects_paths_outside(simple_form_path, tmp_path):
+    run_job(simple_form_path, _records(1), tmp_path / "out", workers=1)
+    (tmp_path / "outside.pdf").write_bytes(b"")
+    with open(tmp_path / "out" / MANIFEST_NAME, "a") as f:
+        f.write(json.dumps({"id": "x", "path": "../outside.pdf", "sha256": "e3b0c44298fc1c149afbf4c8996fb924"
+                            "27ae41e4649b934ca495991b7852b855", "bytes": 0}) + "\n")
+    assert verify_outputs(tmp_path / "out") == ["x"]
+
+
+def test_run_job_invalid_shard(simple_form_path, tmp_path):
+    with pytest.raises(ValueError):
+        run_job(simple_form_path, [], tmp_path, shard=2, shard_count=2)
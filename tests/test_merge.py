@@ -0,0 +1,57 @@
+import io
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes
+from pdf_form.form_filling import pdf_reader_to_writer
+from pdf_form.merge import fill_merged
+
+
+def _merged_reader(writer):
+    return PdfReader(io.BytesIO(write_pdf_to_bytes(writer)))
+
+
+def test_fill_merged_simple_form(simple_form_path):
+    records = [{"Given Name Text Box": f"Name {i}", "Driving License Check Box": "Yes" if i % 2 else "Off"}
+               for i in range(3)]
+    reader = _merged_reader(fill_merged(simple_form_path, records))
+    template_pages = len(load_pdf(simple_form_path).pages)
+    assert len(reader.pages) == 3 * template_pages
+
+    fields = reader.get_fields()
+    for i in range(3):
+        assert fields[f"r{i}.Given Name Text Box"]["/V"] == f"Name {i}"
+        assert fields[f"r{i}.Driving License Check Box"]["/V"] == ("/Yes" if i % 2 else "/Off")
+    assert reader.trailer["/Root"]["/AcroForm"]["/NeedAppearances"]
+
+
+def test_fill_merged_shares_resources(simple_form_path):
+    reader = _merged_reader(fill_merged(simple_form_path, [{}, {}]))
+    first, second = reader.pages[0], reader.pages[len(reader.pages) // 2]
+    assert first.indirect_reference != second.indirect_reference
+    assert first.raw_get("/Resources") == second.raw_get("/Resources")
+    assert first.raw_get("/Contents") == second.raw_get("/Contents")
+    assert all(annot.get_object().raw_get("/P") == second.indirect_reference for annot in second["/Annots"])
+
+
+def test_fill_merged_grows_with_records_not_form_size(complex_form_path):
+    template_size = len(write_pdf_to_bytes(pdf_reader_to_writer(load_pdf(complex_form_path))))
+    one, three = (
+        len(write_pdf_to_bytes(fill_merged(complex_form_path, [{}] * count))) for count in (1, 3)
+    )
+    assert three - one < template_size / 2
+
+
+def test_fill_merged_qualified_names(complex_form_path):
+    records = [{"topmostSubform[0].Page2[0].MI[0]": "A"}, {"First_Name_Given_Name[0]": "Bob"}]
+    fields = _merged_reader(fill_merged(complex_form_path, records, field_prefix="copy", read_only=True)).get_fields()
+    assert fields["copy0.topmostSubform[0].Page2[0].MI[0]"]["/V"] == "A"
+    assert fields["copy1.topmostSubform[0].Page2[0].MI[0]"].get("/V") != "A"
+    assert fields["copy1.topmostSubform[0].Page1[0].First_Name_Given_Name[0]"]["/V"] == "Bob"
+    assert fields["copy1.topmostSubform[0].Page1[0].First_Name_Given_Name[0]"]["/Ff"] == 1
+
+
+def test_fill_merged_without_records(simple_form_path):
+    with pytest.raises(ValueError):
+        fill_merged(simple_form_path, [])
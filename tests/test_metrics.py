@@ -0,0 +1,74 @@
+import pytest
+
+from pdf_form.file_operations import iter_pdf_chunks, load_pdf, write_pdf_to_bytes
+from pdf_form.form_filling import pdf_reader_to_writer, update_pdf_form_fields_from_dict
+from pdf_form.metrics import MetricsRecorder, collect_metrics, current_metrics, set_metrics_hook
+from pdf_form.template import FormTemplate
+
+
+@pytest.fixture
+def recorder():
+    recorder = MetricsRecorder()
+    set_metrics_hook(recorder)
+    yield recorder
+    set_metrics_hook(None)
+
+
+def test_metrics_off_by_default(simple_form_path):
+    assert current_metrics() is None
+    writer = pdf_reader_to_writer(load_pdf(simple_form_path))
+    update_pdf_form_fields_from_dict(writer, {"Given Name Text Box": "Alice"})
+    assert current_metrics() is None
+
+
+def test_collect_metrics_stages(simple_form_path):
+    with collect_metrics() as metrics:
+        writer = pdf_reader_to_writer(load_pdf(simple_form_path))
+        update_pdf_form_fields_from_dict(writer, {"Given Name Text Box": "Alice", "Driving License Check Box": "Yes"})
+        pdf_bytes = write_pdf_to_bytes(writer)
+
+    assert set(metrics.stage_seconds) == {"load", "clone", "annotation_iter", "update_fields", "write"}
+    assert metrics.fields_updated == 2
+    assert metrics.annotations_visited > 2
+    assert metrics.output_bytes == len(pdf_bytes)
+    assert metrics.total_seconds >= metrics.stage_seconds["update_fields"]
+    assert metrics.as_dict()["fields_updated"] == 2
+
+
+def test_collect_metrics_callback_and_nesting(simple_form_path):
+    reported = []
+    with collect_metrics() as outer:
+        with collect_metrics(reported.append) as inner:
+            load_pdf(simple_form_path)
+        load_pdf(simple_form_path)
+    assert reported == [inner]
+    assert outer.stage_seconds["load"] > inner.stage_seconds["load"]
+
+
+def test_streamed_output_recorded(simple_form_path):
+    writer = pdf_reader_to_writer(load_pdf(simple_form_path))
+    with collect_metrics() as metrics:
+        size = sum(len(chunk) for chunk in iter_pdf_chunks(writer, chunk_size=1024))
+    assert metrics.output_bytes == size
+    assert "write" in metrics.stage_seconds
+
+
+def test_template_fill_hook(simple_form_path, recorder):
+    template = FormTemplate(simple_form_path)
+    assert recorder.fills == 0
+    pdf_bytes = template.fill({"Given Name Text Box": "Alice"})
+    template.fill({"Family Name Text Box": "Smith", "Language 1 Check Box": "Yes"})
+
+    summary = recorder.as_dict()
+    assert summary["fills"] == 2
+    assert summary["fields_updated"] == 3
+    assert summary["slowest"]["output_bytes"] in (len(pdf_bytes), summary["output_bytes"] - len(pdf_bytes))
+
+
+def test_prometheus_export(simple_form_path, recorder):
+    FormTemplate(simple_form_path).fill({"Given Name Text Box": "Alice"})
+    text = recorder.to_prometheus()
+    assert 'pdf_form_stage_seconds_total{stage="update_fields"}' in text
+    assert "pdf_form_fields_updated_total 1\n" in text
+    assert 'pdf_form_fill_seconds_bucket{le="+Inf"} 1\n' in text
+    assert "pdf_form_fill_seconds_count 1\n" in text
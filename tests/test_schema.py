@@ -0,0 +1,108 @@
+import io
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_form import schema as schema_module
+from pdf_form.file_operations import load_pdf, write_pdf_to_bytes
+from pdf_form.form_filling import extract_checkbox_values, pdf_reader_to_writer, update_pdf_form_fields_from_dict
+from pdf_form.schema import FieldSchema, FormSchema, SchemaCache, extract_form_schema
+from pdf_form.template import FormTemplate
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with SchemaCache(tmp_path / "schemas.sqlite3", max_entries=2) as cache:
+        yield cache
+
+
+def test_extract_form_schema(simple_form_path, complex_form_path):
+    schema = extract_form_schema(simple_form_path)
+    given_name = schema.fields[0]
+    assert given_name.name == "Given Name Text Box"
+    assert given_name.field_type == "/Tx"
+    assert given_name.page_number == 0
+    assert given_name.rect == pytest.approx((165.7, 453.7, 315.7, 467.9))
+    assert extract_form_schema(complex_form_path).checkbox_values == extract_checkbox_values(complex_form_path)
+
+
+def test_schema_json_round_trip(complex_form_path):
+    schema = extract_form_schema(complex_form_path)
+    assert FormSchema.from_json(schema.to_json()) == schema
+
+
+def test_cache_returns_stored_schema_without_parsing(cache, simple_form_path, monkeypatch):
+    schema = cache.get_or_extract(simple_form_path)
+    monkeypatch.setattr(schema_module, "extract_form_schema", lambda _: pytest.fail("PDF was parsed again"))
+    assert cache.get_or_extract(simple_form_path) == schema
+
+
+def test_cache_skips_reading_unchanged_files(cache, simple_form_path, tmp_path, monkeypatch):
+    path = tmp_path / "form.pdf"
+    path.write_bytes(simple_form_path.read_bytes())
+    schema = cache.get_or_extract(path)
+    monkeypatch.setattr(schema_module, "_read_bytes", lambda _: pytest.fail("PDF was read again"))
+    assert cache.get_or_extract(path) == schema
+    monkeypatch.undo()
+    path.write_bytes(write_pdf_to_bytes(load_pdf(simple_form_path)))
+    # a modified file is read and keyed by its new contents
+    assert cache.get_or_extract(path) == schema
+    assert len(cache) == 2
+
+
+def test_cache_persists_and_evicts_least_recently_used(tmp_path, simple_form_path):
+    path = tmp_path / "schemas.sqlite3"
+    schema = extract_form_schema(simple_form_path)
+    with SchemaCache(path, max_entries=2) as cache:
+        cache.put("a", schema)
+        cache.put("b", schema)
+    with SchemaCache(path, max_entries=2, memory_entries=0) as cache:
+        assert cache.get("a") == schema
+        cache.put("c", schema)
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == schema
+
+
+def test_cache_memory_hits_count_as_use(tmp_path, simple_form_path):
+    path = tmp_path / "schemas.sqlite3"
+    schema = extract_form_schema(simple_form_path)
+    with SchemaCache(path, max_entries=2) as cache:
+        cache.put("a", schema)
+        cache.put("b", schema)
+        assert cache.get("a") == schema
+        cache.put("c", schema)
+        assert cache.get("a") == schema
+    with SchemaCache(path, max_entries=2, memory_entries=0) as cache:
+        assert cache.get("b") is None
+        assert cache.get("a") == schema
+        assert cache.get("c") == schema
+
+
+def test_field_types_ambiguous_partial_names():
+    fields = (
+        FieldSchema("Name", "a.Name", "/Tx", 0, None),
+        FieldSchema("Name", "b.Name", "/Btn", 0, None, ("/Yes",)),
+        FieldSchema("Other", "a.Other", "/Tx", 0, None),
+        FieldSchema("Other", "a.Other", "/Tx", 1, None),
+    )
+    assert FormSchema(fields).field_types == {"a.Name": "/Tx", "b.Name": "/Btn", "a.Other": "/Tx", "Other": "/Tx"}
+
+
+def test_fill_with_schema(simple_form_path):
+    schema = extract_form_schema(simple_form_path)
+    data = {"Given Name Text Box": "Alice", "Driving License Check Box": "Yes"}
+
+    writer = pdf_reader_to_writer(load_pdf(simple_form_path))
+    update_pdf_form_fields_from_dict(writer, data, schema=schema)
+    from_schema = FormTemplate(simple_form_path, schema=schema).fill(data)
+
+    for pdf_bytes in (write_pdf_to_bytes(writer), from_schema):
+        fields = PdfReader(io.BytesIO(pdf_bytes)).get_fields()
+        assert fields["Given Name Text Box"]["/V"] == "Alice"
+        assert fields["Driving License Check Box"]["/V"] == "/Yes"
+
+
+def test_template_rejects_mismatched_schema(simple_form_path, complex_form_path):
+    with pytest.raises(ValueError):
+        FormTemplate(simple_form_path, schema=extract_form_schema(complex_form_path))
@@ -0,0 +1,92 @@
+import math
+import random
+
+import pytest
+
+from pdf_form.schema import FieldSchema, FormSchema
+from pdf_form.spatial import WidgetIndex
+
+
+def _field(name, page, rect):
+    return FieldSchema(name, f"form.{name}", "/Tx", page, rect)
+
+
+@pytest.fixture
+def grid_schema():
+    rng = random.Random(7)
+    fields = []
+    for n in range(300):
+        x, y = rng.uniform(0, 550), rng.uniform(0, 750)
+        fields.append(_field(f"f{n}", n % 3, (x, y, x + rng.uniform(5, 120), y + rng.uniform(5, 30))))
+    fields.append(FieldSchema("no_rect", "no_rect", "/Tx", 0, None))
+    return FormSchema(tuple(fields))
+
+
+def _distance(rect, x, y):
+    return math.hypot(max(rect[0] - x, 0, x - rect[2]), max(rect[1] - y, 0, y - rect[3]))
+
+
+def test_containing_and_overlapping_match_brute_force(grid_schema):
+    index = WidgetIndex(grid_schema)
+    rng = random.Random(1)
+    fields = [field for field in grid_schema.fields if field.rect]
+    for _ in range(200):
+        x, y, page = rng.uniform(0, 612), rng.uniform(0, 792), rng.randrange(3)
+        expected = [f for f in fields if f.page_number == page and f.rect[0] <= x <= f.rect[2] and f.rect[1] <= y <= f.rect[3]]
+        assert sorted(f.name for f in index.containing(x, y, page)) == sorted(f.name for f in expected)
+
+        box = (x, y, x + 40, y + 15)
+        expected = [
+            f for f in fields
+            if f.page_number == page and f.rect[0] <= box[2] and box[0] <= f.rect[2]
+            and f.rect[1] <= box[3] and box[1] <= f.rect[3]
+        ]
+        assert index.overlapping(*box, page) == expected
+
+
+def test_overlapping_huge_box(grid_schema):
+    index = WidgetIndex(grid_schema, cell_size=1)
+    assert index.cell_size == 8
+    # only the page's occupied cells are visited, not the millions the box covers
+    assert index.overlapping(-1e4, -1e4, 1e4, 1e4, 1) == [f for f in grid_schema.fields if f.page_number == 1]
+    assert index.overlapping(5e3, 5e3, 1e4, 1e4, 1) == []
+
+
+def test_default_cell_size_uses_smaller_side():
+    schema = FormSchema(tuple(_field(f"f{n}", 0, (0, 20 * n, 300, 20 * n + 12)) for n in range(5)))
+    assert WidgetIndex(schema).cell_size == 12
+
+
+def test_nearest_matches_brute_force(grid_schema):
+    index = WidgetIndex(grid_schema)
+    rng = random.Random(2)
+    fields = [field for field in grid_schema.fields if field.rect]
+    for _ in range(200):
+        x, y, page = rng.uniform(-100, 700), rng.uniform(-100, 900), rng.randrange(3)
+        field, distance = index.nearest(x, y, page)
+        expected = min(_distance(f.rect, x, y) for f in fields if f.page_number == page)
+        assert distance == pytest.approx(expected)
+        assert _distance(field.rect, x, y) == pytest.approx(expected)
+
+
+def test_nearest_max_distance_and_empty_page(grid_schema):
+    index = WidgetIndex(grid_schema)
+    assert index.nearest(5000, 5000, 0, max_distance=10) is None
+    assert index.nearest(10, 10, 99) is None
+    field, distance = index.nearest(-1e6, -1e6, 0)
+    assert distance == pytest.approx(min(_distance(f.rect, -1e6, -1e6) for f in grid_schema.fields[:-1:3]))
+
+
+def test_locate(grid_schema):
+    index = WidgetIndex(grid_schema)
+    assert len(index) == 300
+    assert index.locate("f4") == index.locate("form.f4") == [(1, grid_schema.fields[4].rect)]
+    assert index.locate("no_rect") == []
+
+
+def test_index_bundled_form(simple_form_path):
+    index = WidgetIndex.from_pdf(simple_form_path)
+    [(page, rect)] = index.locate("Given Name Text Box")
+    center = ((rect[0] + rect[2]) / 2, (rect[1] + rect[3]) / 2)
+    assert [field.name for field in index.containing(*center, page)] == ["Given Name Text Box"]
+    assert index.nearest(rect[2] + 1, rect[1], page)[0].name == "Given Name Text Box"
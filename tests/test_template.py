@@ -0,0 +1,53 @@
+import io
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_form.template import FormTemplate
+
+
+def _filled_values(pdf_bytes):
+    fields = PdfReader(io.BytesIO(pdf_bytes)).get_fields()
+    return {key: value.get("/V") for key, value in fields.items()}
+
+
+@pytest.fixture
+def simple_template(simple_form_path):
+    return FormTemplate(simple_form_path)
+
+
+def test_template_field_names(simple_template):
+    assert "Given Name Text Box" in simple_template.field_names
+    assert "Driving License Check Box" in simple_template.field_names
+
+
+def test_template_fill(simple_template):
+    values = _filled_values(
+        simple_template.fill({"Given Name Text Box": "Alice", "Driving License Check Box": "Yes"})
+    )
+    assert values["Given Name Text Box"] == "Alice"
+    assert values["Driving License Check Box"] == "/Yes"
+
+
+def test_template_fill_does_not_leak_between_fills(simple_template, simple_form_path):
+    simple_template.fill({"Given Name Text Box": "Alice", "Language 1 Check Box": "Yes"})
+    values = _filled_values(simple_template.fill({"Family Name Text Box": "Smith"}))
+    original = _filled_values(open(simple_form_path, "rb").read())
+    assert values["Family Name Text Box"] == "Smith"
+    assert values["Given Name Text Box"] == original["Given Name Text Box"]
+    assert values["Language 1 Check Box"] == original["Language 1 Check Box"]
+
+
+def test_template_fill_read_only(complex_form_path):
+    template = FormTemplate(complex_form_path)
+    pdf_bytes = template.fill({"First_Name_Given_Name[0]": "Bob"}, read_only=True)
+    fields = PdfReader(io.BytesIO(pdf_bytes)).get_fields()
+    field = fields["topmostSubform[0].Page1[0].First_Name_Given_Name[0]"]
+    assert field["/V"] == "Bob"
+    assert field["/Ff"] == 1
+
+
+def test_template_fill_qualified_name(complex_form_path):
+    template = FormTemplate(complex_form_path)
+    pdf_bytes = template.fill({"topmostSubform[0].Page2[0].MI[0]": "Q"})
+    assert _filled_values(pdf_bytes)["topmostSubform[0].Page2[0].MI[0]"] == "Q"